@@ -1,17 +1,86 @@
-from flask import Flask, render_template, request
+from flask import Flask, render_template, request, jsonify, send_file, abort
+import os
+import re
+import time
+import uuid
 import pandas as pd
-from networksecurity.utils.main_utils.utils import load_object
-from networksecurity.utils.ml_utils.model.estimator import NetworkModel
+from networksecurity.utils.ml_utils.model.model_loader import ModelReloader
 from networksecurity.exception.exception import NetworkSecurityException
-from networksecurity.utils.ml_utils.feature_extractor import extract_features
+from networksecurity.logging.logger import logging
+from networksecurity.utils.ml_utils.feature_engine import FeatureExtractionEngine
+from networksecurity.utils.ml_utils.feature_extractor import whois_cache_stats, FEATURE_COLUMNS
+from networksecurity.utils.ml_utils.prediction_cache import PredictionCache
+from networksecurity.utils.ml_utils.drift_monitor import FeatureDriftMonitor
+from networksecurity.utils.ml_utils.model.lookup_scorer import LookupTableScorer
+from networksecurity.utils.main_utils.utils import load_object, load_numpy_array_data
+from networksecurity.pipeline.batch_prediction import UrlBatchPredictor, URL_BATCH_MAX_SIZE
+from networksecurity.constant.training_pipeline import (
+    PREDICTION_OUTPUT_DIR,
+    PREDICTION_OUTPUT_FILE_NAME,
+    PREDICTION_OUTPUT_TTL,
+    FINAL_FEATURE_BASELINE_FILE_PATH,
+    FINAL_FEATURE_KEYS_FILE_PATH,
+)
 import sys
 
 app = Flask(__name__)
 
-# Load pre-trained objects
-preprocessor = load_object("final_model/preprocessor.pkl")
-final_model = load_object("final_model/model.pkl")
-network_model = NetworkModel(preprocessor=preprocessor, model=final_model)
+# Load pre-trained objects; a retrained final_model/ is picked up in the background
+model_reloader = ModelReloader()
+network_model = model_reloader.load()
+model_version = model_reloader.version
+
+# Verdicts keyed by the URL as scored; set PREDICTION_CACHE_FILE_PATH to keep
+# them in SQLite across restarts
+prediction_cache = PredictionCache(
+    model_version=model_version,
+    sqlite_file_path=os.getenv("PREDICTION_CACHE_FILE_PATH"),
+)
+
+def load_feature_baseline():
+    # models trained before baselines existed have none, monitoring stays off
+    if os.path.exists(FINAL_FEATURE_BASELINE_FILE_PATH):
+        return load_object(FINAL_FEATURE_BASELINE_FILE_PATH)
+    return None
+
+# Rolling histograms of served feature vectors, compared with the training baseline
+drift_monitor = FeatureDriftMonitor(baseline=load_feature_baseline())
+
+def load_feature_keys():
+    # models trained before feature keys existed start from an empty table
+    if os.path.exists(FINAL_FEATURE_KEYS_FILE_PATH):
+        return load_numpy_array_data(FINAL_FEATURE_KEYS_FILE_PATH)
+    return None
+
+# Verdicts keyed by the packed feature vector, prefilled with the training vectors
+lookup_scorer = LookupTableScorer(
+    columns=FEATURE_COLUMNS,
+    network_model=network_model,
+    feature_keys=load_feature_keys(),
+)
+
+# Runs the network-bound feature groups concurrently under one deadline
+feature_engine = FeatureExtractionEngine()
+batch_predictor = UrlBatchPredictor(
+    network_model=network_model,
+    feature_engine=feature_engine,
+    prediction_cache=prediction_cache,
+    drift_monitor=drift_monitor,
+    lookup_scorer=lookup_scorer,
+)
+
+def on_model_reload(version, model):
+    batch_predictor.network_model = model
+    prediction_cache.set_model_version(version)
+    drift_monitor.set_baseline(load_feature_baseline())
+    lookup_scorer.set_model(model, load_feature_keys())
+
+model_reloader.add_listener(on_model_reload)
+
+@app.before_request
+def ensure_model_reloader():
+    # started lazily so a preloaded gunicorn master never runs the poller
+    model_reloader.start()
 
 @app.route("/", methods=["GET", "POST"])
 def index():
@@ -20,16 +89,11 @@ def index():
     if request.method == "POST":
         try:
             url = request.form.get("url")
-            df = pd.DataFrame([extract_features(url)])
-            y_pred = network_model.predict(df)[0]
+            verdict = batch_predictor.predict([url])[0]
 
             # Map 0/1 to Safe / Phishing
-            if y_pred == 0:
-                result = "Safe "
-                status_class = "safe"
-            else:
-                result = "Phishing "
-                status_class = "phishing"
+            result = verdict["result"]
+            status_class = result.lower()
 
             return render_template("index.html", result=result, status_class=status_class, url=url)
 
@@ -38,5 +102,82 @@ def index():
 
     return render_template("index.html", result=result, url=url, status_class="")
 
+def prediction_output_file_path(prediction_id: str) -> str:
+    # one file per batch, so concurrent users and workers never share results
+    name, extension = os.path.splitext(PREDICTION_OUTPUT_FILE_NAME)
+    return os.path.join(PREDICTION_OUTPUT_DIR, f"{name}_{prediction_id}{extension}")
+
+def remove_expired_prediction_outputs():
+    now = time.time()
+    for entry in os.scandir(PREDICTION_OUTPUT_DIR):
+        try:
+            if entry.is_file() and now - entry.stat().st_mtime > PREDICTION_OUTPUT_TTL:
+                os.remove(entry.path)
+        except OSError:
+            pass  # removed by another worker
+
+@app.route("/predict/batch", methods=["POST"])
+def predict_batch():
+    """
+    JSON: {"urls": [...]} -> {"results": [...]}, one verdict per URL.
+    Form: newline separated "urls" -> results table with CSV download.
+    "mode": "lexical" (JSON field or query parameter) scores from the URL
+    strings alone, without any network call.
+    """
+    try:
+        if request.is_json:
+            payload = request.get_json(silent=True) or {}
+            urls = payload.get("urls") or []
+            mode = payload.get("mode") or request.args.get("mode")
+        else:
+            urls = [u.strip() for u in request.form.get("urls", "").splitlines() if u.strip()]
+            mode = request.form.get("mode") or request.args.get("mode")
+
+        if not isinstance(urls, list) or not all(isinstance(u, str) for u in urls):
+            return jsonify({"error": "urls must be a list of strings"}), 400
+        if len(urls) > URL_BATCH_MAX_SIZE:
+            return jsonify({"error": f"at most {URL_BATCH_MAX_SIZE} urls per batch"}), 400
+
+        results = batch_predictor.predict(urls, lexical_only=(mode == "lexical"))
+
+        if request.is_json:
+            return jsonify({"results": results})
+
+        df = pd.DataFrame(results, columns=["url", "result"])
+        os.makedirs(PREDICTION_OUTPUT_DIR, exist_ok=True)
+        remove_expired_prediction_outputs()
+        prediction_id = uuid.uuid4().hex
+        df.to_csv(prediction_output_file_path(prediction_id), index=False)
+        table = df.to_html(classes="table table-striped", index=False)
+        return render_template("table.html", table=table, download=True, prediction_id=prediction_id)
+
+    except Exception as e:
+        if request.is_json:
+            # API clients get JSON back, the details stay in the log
+            logging.info(f"Batch prediction failed: {NetworkSecurityException(e, sys)}")
+            return jsonify({"error": "batch prediction failed"}), 500
+        raise NetworkSecurityException(e, sys)
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return jsonify({
+        "prediction_cache": prediction_cache.stats(),
+        "whois_cache": whois_cache_stats(),
+        "lookup_table": lookup_scorer.stats(),
+        "model_version": model_reloader.version,
+        # per worker process: each gunicorn worker sees its own share of traffic
+        "feature_drift": drift_monitor.report(),
+    })
+
+@app.route("/download/<prediction_id>", methods=["GET"])
+def download_file(prediction_id):
+    # ids are uuid4 hex strings, anything else could point outside the output dir
+    if not re.fullmatch(r"[0-9a-f]{32}", prediction_id):
+        abort(404)
+    file_path = os.path.abspath(prediction_output_file_path(prediction_id))
+    if not os.path.exists(file_path):
+        abort(404)
+    return send_file(file_path, as_attachment=True, download_name=PREDICTION_OUTPUT_FILE_NAME)
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8000, debug=True)
@@ -0,0 +1,23 @@
+'''
+Gunicorn settings for the web app (picked up automatically from the working directory).
+The app, and with it the model, is loaded once in the master before the workers
+are forked, so the model memory is shared copy-on-write instead of being
+unpickled again by every worker. A model reloaded after a retrain is loaded
+by each worker on its own until gunicorn is restarted (a HUP is not enough,
+the master keeps the model it preloaded).
+'''
+import gc
+import os
+
+bind = "0.0.0.0:8000"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+preload_app = True
+# a URL batch ends within FEATURE_EXTRACTION_BATCH_DEADLINE (20 s) plus scoring,
+# the 30 s default would kill a worker on a slow cold batch and lose it
+timeout = 60
+
+
+def pre_fork(server, worker):
+    # move everything loaded so far out of the collector's reach, so gc passes
+    # in the workers do not touch (and copy) the preloaded pages
+    gc.freeze()
@@ -1,4 +1,5 @@
 import os,sys
+import shutil
 import pandas as pd
 import numpy as np
 import pymongo
@@ -9,7 +10,11 @@ from networksecurity.entity.artifact_entity import DataIngestionArtifact
 # configuration of data ingestion configuration
 from networksecurity.entity.config_entity import DataIngestionConfig
 from typing import List
-from sklearn.model_selection import train_test_split
+from concurrent.futures import ThreadPoolExecutor
+from networksecurity.constant.training_pipeline import SCHEMA_FILE_PATH
+from networksecurity.utils.main_utils.utils import (
+    read_yaml_file, save_object, load_object, write_dataframe, read_dataframe
+)
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -23,49 +28,227 @@ class DataIngestion:
         except Exception as e:
             raise NetworkSecurityException(e,sys)
         
-    def export_collection_as_dataframe(self):
+    def get_schema_columns(self) -> List[str]:
+        schema_config=read_yaml_file(SCHEMA_FILE_PATH)
+        return [list(col.keys())[0] for col in schema_config["columns"]]
+
+    def get_id_ranges(self,collection,n_ranges:int,query:dict=None) -> list:
+        '''
+        Split the documents matching query into n_ranges (lower, upper) _id
+        bounds of about equal size, using only the _id index. None means unbounded.
+        '''
+        query=query or {}
+        if n_ranges<=1:
+            return [(None,None)]
+        count=collection.count_documents(query) if query else collection.estimated_document_count()
+        if count<n_ranges:
+            return [(None,None)]
+        bounds=[None]
+        for i in range(1,n_ranges):
+            boundary=next(
+                collection.find(query,{"_id":1}).sort("_id",1).skip(i*count//n_ranges).limit(1),
+                None,
+            )
+            if boundary is not None and boundary["_id"]!=bounds[-1]:
+                bounds.append(boundary["_id"])
+        bounds.append(None)
+        return list(zip(bounds[:-1],bounds[1:]))
+
+    def read_id_range(self,collection,columns:List[str],id_range:tuple,query:dict=None) -> np.ndarray:
+        '''
+        Stream the documents of one _id range matching query into a float64
+        (rows, columns) array, one cursor batch at a time.
+        "na" and missing fields become NaN.
+        '''
+        lower,upper=id_range
+        query=dict(query or {})
+        id_query=dict(query.get("_id",{}))
+        if lower is not None:
+            id_query["$gte"]=lower
+        if upper is not None:
+            id_query["$lt"]=upper
+        if id_query:
+            query["_id"]=id_query
+        projection={col:1 for col in columns}
+        projection["_id"]=0
+        batch_size=self.data_ingestion_config.cursor_batch_size
+
+        cursor=collection.find(query,projection,batch_size=batch_size)
+        if id_query:
+            cursor=cursor.sort("_id",1)
+
+        chunks=[]
+        rows=[]
+        for document in cursor:
+            rows.append([document.get(col) for col in columns])
+            if len(rows)==batch_size:
+                chunks.append(self._rows_to_array(rows))
+                rows=[]
+        if rows or not chunks:
+            chunks.append(self._rows_to_array(rows,n_columns=len(columns)))
+        return np.concatenate(chunks) if len(chunks)>1 else chunks[0]
+
+    @staticmethod
+    def _rows_to_array(rows:list,n_columns:int=0) -> np.ndarray:
+        if not rows:
+            return np.empty((0,n_columns),dtype=np.float64)
+        values=np.array(rows,dtype=object)
+        values[(values=="na")|(values==None)]=np.nan  # noqa: E711
+        return values.astype(np.float64)
+
+    def get_collection(self):
+        database_name=self.data_ingestion_config.database_name
+        collection_name=self.data_ingestion_config.collection_name
+        self.mongo_client=pymongo.MongoClient(MONGO_DB_URL)
+        return self.mongo_client[database_name][collection_name]
+
+    def export_collection_as_dataframe(self,query:dict=None):
         '''
         Read data from MongoDB collection and convert it into pandas dataframe
         1. Read the collection name and database name from the data ingestion config
-        2. Use pymongo to read the data from the collection
-        3. Convert the data into pandas dataframe
-        4. Replace "na" values with np.NAN
+        2. Stream only the schema columns (no _id) of the documents matching query
+           in cursor batches, optionally over several _id ranges read in parallel
+        3. Fill typed float64 buffers chunk by chunk, "na" becomes np.nan
+        4. Columns without missing values go back to int64
         '''
         try:
-            database_name=self.data_ingestion_config.database_name
-            collection_name=self.data_ingestion_config.collection_name
-            self.mongo_client=pymongo.MongoClient(MONGO_DB_URL)
-            collection=self.mongo_client[database_name][collection_name]
-            df=pd.DataFrame(list(collection.find()))
-            if "_id" in df.columns:
-                df=df.drop(columns=["_id"],axis=1)
-            df.replace(to_replace="na", value=np.nan, inplace=True)
+            collection=self.get_collection()
+            columns=self.get_schema_columns()
+
+            id_ranges=self.get_id_ranges(collection,self.data_ingestion_config.n_readers,query)
+            if len(id_ranges)==1:
+                values=self.read_id_range(collection,columns,id_ranges[0],query)
+            else:
+                with ThreadPoolExecutor(max_workers=len(id_ranges)) as executor:
+                    parts=list(executor.map(
+                        lambda id_range:self.read_id_range(collection,columns,id_range,query),id_ranges
+                    ))
+                values=np.concatenate(parts)
+            logging.info(f"Exported {len(values)} documents from {collection.full_name} over {len(id_ranges)} range(s)")
+
+            df=pd.DataFrame(values,columns=columns)
+            complete_columns=[col for col in columns if not np.isnan(df[col].to_numpy()).any()]
+            df[complete_columns]=df[complete_columns].astype(np.int64)
             return df
         
         except Exception as e:
             raise NetworkSecurityException(e,sys)
             
-    def export_data_into_feature_store(self,dataframe):
+    def get_collection_summary(self) -> dict:
+        '''
+        Cheap summary of the source collection (document count and newest _id),
+        used by TrainingPipeline to fingerprint the ingestion stage.
+        In-place updates of existing documents are not detected.
+        '''
         try:
-            feature_store_file_path=self.data_ingestion_config.feature_store_file_path
-            # creating folder
-            dir_path=os.path.dirname(feature_store_file_path)
-            os.makedirs(dir_path,exist_ok=True)
-            dataframe.to_csv(feature_store_file_path,index=False,header=True)
-            return dataframe
+            collection=self.get_collection()
+            last_document=collection.find_one(sort=[("_id", -1)], projection={"_id": 1})
+            return {
+                "count": collection.estimated_document_count(),
+                "last_id": str(last_document["_id"]) if last_document else None,
+            }
+        except Exception as e:
+            raise NetworkSecurityException(e,sys)
+
+    def read_watermark(self):
+        '''
+        Watermark of the feature store ({"last_id", "rows", "partitions"}),
+        or None when there is no usable feature store yet.
+        '''
+        watermark_file_path=self.data_ingestion_config.watermark_file_path
+        if not os.path.exists(watermark_file_path):
+            return None
+        watermark=load_object(watermark_file_path)
+        feature_store_dir=self.data_ingestion_config.feature_store_dir
+        if not all(os.path.exists(os.path.join(feature_store_dir,name)) for name in watermark["partitions"]):
+            return None
+        return watermark
+
+    def export_data_into_feature_store(self,dataframe,watermark:dict,last_id):
+        '''
+        Append dataframe as a new partition of the feature store and move the
+        watermark to last_id. The watermark is written after the partition,
+        so a crash in between leaves the previous state intact.
+        '''
+        try:
+            feature_store_dir=self.data_ingestion_config.feature_store_dir
+            os.makedirs(feature_store_dir,exist_ok=True)
+            partition_name=f"part-{len(watermark['partitions']):05d}.parquet"
+            write_dataframe(os.path.join(feature_store_dir,partition_name),dataframe)
+            watermark={
+                "last_id":last_id,
+                "rows":watermark["rows"]+len(dataframe),
+                "partitions":watermark["partitions"]+[partition_name],
+            }
+            save_object(self.data_ingestion_config.watermark_file_path,watermark)
+            logging.info(f"Appended {len(dataframe)} rows to the feature store as {partition_name}")
+            return watermark
+        except Exception as e:
+            raise NetworkSecurityException(e,sys)
+
+    def load_feature_store(self,watermark:dict) -> pd.DataFrame:
+        feature_store_dir=self.data_ingestion_config.feature_store_dir
+        partitions=[
+            read_dataframe(os.path.join(feature_store_dir,name)) for name in watermark["partitions"]
+        ]
+        if not partitions:
+            return pd.DataFrame(columns=self.get_schema_columns())
+        return pd.concat(partitions,ignore_index=True)
+
+    def update_feature_store(self) -> dict:
+        '''
+        Fetch only documents newer than the watermark and append them to the
+        feature store. The whole collection is re-read when there is no feature
+        store yet, or when the number of documents up to the watermark _id no
+        longer matches the rows ingested: documents were removed, or a client
+        inserted documents whose _id sorts below the watermark (ObjectIds are
+        made by the clients, so a late insert from another host can have a
+        smaller _id than one already ingested).
+        In-place updates of already ingested documents are not picked up, nor
+        are a removal and a late insert that cancel out between two runs.
+        '''
+        try:
+            collection=self.get_collection()
+            watermark=self.read_watermark()
+            if watermark is not None and watermark["last_id"] is not None:
+                # counted on the _id index, no document is read
+                ingested=collection.count_documents({"_id":{"$lte":watermark["last_id"]}})
+                if ingested!=watermark["rows"]:
+                    logging.info(
+                        f"{ingested} documents up to the watermark, {watermark['rows']} rows ingested"
+                    )
+                    watermark=None
+            if watermark is None:
+                logging.info("Rebuilding the feature store from the full collection")
+                shutil.rmtree(self.data_ingestion_config.feature_store_dir,ignore_errors=True)
+                watermark={"last_id":None,"rows":0,"partitions":[]}
+
+            last_document=collection.find_one(sort=[("_id",-1)],projection={"_id":1})
+            if last_document is None or last_document["_id"]==watermark["last_id"]:
+                logging.info(f"Feature store is up to date ({watermark['rows']} rows)")
+                return watermark
+
+            # upper bound keeps documents inserted during the read for the next run
+            query={"_id":{"$lte":last_document["_id"]}}
+            if watermark["last_id"] is not None:
+                query["_id"]["$gt"]=watermark["last_id"]
+            dataframe=self.export_collection_as_dataframe(query)
+            return self.export_data_into_feature_store(dataframe,watermark,last_document["_id"])
         except Exception as e:
             raise NetworkSecurityException(e,sys)
             
     def split_data_as_train_test(self,dataframe):    
         try:
-            train_set,test_set=train_test_split(dataframe,test_size=self.data_ingestion_config.train_test_split_ratio,random_state=42)
+            # a row's split is decided by a hash of its values, so rows never move
+            # between train and test as the feature store grows, and duplicate
+            # rows always land on the same side
+            row_hash=pd.util.hash_pandas_object(dataframe.astype(np.float64),index=False).to_numpy()
+            is_test=(row_hash%10_000)<self.data_ingestion_config.train_test_split_ratio*10_000
+            train_set,test_set=dataframe[~is_test],dataframe[is_test]
             logging.info("Performed train test split")
             logging.info("Exited split_data_as_train_test method of Data Ingestion class")
-            dir_path=os.path.dirname(self.data_ingestion_config.training_file_path)
-            os.makedirs(dir_path,exist_ok=True)
-            logging.info("Created directory for train and test data")
-            train_set.to_csv(self.data_ingestion_config.training_file_path,index=False,header=True)
-            test_set.to_csv(self.data_ingestion_config.test_file_path,index=False,header=True)
+            write_dataframe(self.data_ingestion_config.training_file_path,train_set)
+            write_dataframe(self.data_ingestion_config.test_file_path,test_set)
             logging.info("Saved train and test data")    
         except Exception as e:
             raise NetworkSecurityException(e,sys)
@@ -73,8 +256,8 @@ class DataIngestion:
 
     def initiate_data_ingestion(self):
         try:
-            dataframe=self.export_collection_as_dataframe()
-            dataframe=self.export_data_into_feature_store(dataframe)
+            watermark=self.update_feature_store()
+            dataframe=self.load_feature_store(watermark)
             self.split_data_as_train_test(dataframe)
             dataingestionartifact = DataIngestionArtifact(
             training_file_path=self.data_ingestion_config.training_file_path,
@@ -84,4 +267,4 @@ class DataIngestion:
             return dataingestionartifact
 
         except Exception as e:
-            raise NetworkSecurityException(e,sys)
\ No newline at end of file
+            raise NetworkSecurityException(e,sys)
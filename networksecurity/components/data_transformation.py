@@ -2,11 +2,11 @@ import sys
 import os
 import numpy as np
 import pandas as pd
-from sklearn.impute import KNNImputer
 from sklearn.pipeline import Pipeline
 
 from networksecurity.constant.training_pipeline import TARGET_COLUMN
 from networksecurity.constant.training_pipeline import DATA_TRANSFORMATION_IMPUTER_PARAMS
+from networksecurity.constant.training_pipeline import DATA_TRANSFORMATION_MAX_MISSING_ROW_FRACTION
 
 from networksecurity.entity.artifact_entity import (
     DataTransformationArtifact,
@@ -16,7 +16,10 @@ from networksecurity.entity.artifact_entity import (
 from networksecurity.entity.config_entity import DataTransformationConfig
 from networksecurity.exception import NetworkSecurityException 
 from networksecurity.logging.logger import logging
-from networksecurity.utils.main_utils.utils import save_numpy_array_data, save_object
+from networksecurity.utils.main_utils.utils import save_numpy_array_data, save_object, read_dataframe, compact_array
+from networksecurity.utils.ml_utils.drift_monitor import build_feature_baseline
+from networksecurity.utils.ml_utils.model.imputer import FastPathImputer
+from networksecurity.utils.ml_utils.model.lookup_scorer import pack_feature_vectors
 
 
 class DataTransformation:
@@ -32,18 +35,23 @@ class DataTransformation:
     @staticmethod
     def read_data(file_path) -> pd.DataFrame:
         try:
-            return pd.read_csv(file_path)
+            return read_dataframe(file_path)
         except Exception as e:
             raise NetworkSecurityException(e, sys)
 
     def get_data_transformer_object(self) -> Pipeline:
         """
-        Creates a preprocessing Pipeline with KNN Imputer.
+        Creates a preprocessing Pipeline with an imputer that falls back to
+        KNN only when the training data has enough missing values, and skips
+        imputation for complete rows.
         """
         logging.info("Entered get_data_transformer_object method.")
         try:
-            imputer = KNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS)
-            logging.info(f"Initialized KNNImputer with params: {DATA_TRANSFORMATION_IMPUTER_PARAMS}")
+            imputer = FastPathImputer(
+                knn_params=DATA_TRANSFORMATION_IMPUTER_PARAMS,
+                max_missing_row_fraction=DATA_TRANSFORMATION_MAX_MISSING_ROW_FRACTION,
+            )
+            logging.info(f"Initialized FastPathImputer with KNN params: {DATA_TRANSFORMATION_IMPUTER_PARAMS}")
 
             processor = Pipeline([("imputer", imputer)])
             return processor
@@ -55,15 +63,15 @@ class DataTransformation:
         logging.info("Entered initiate_data_transformation method of DataTransformation class")
 
         try:
-            # Read validated train & test CSV
+            # Read validated train & test data
             train_df = DataTransformation.read_data(self.data_validation_artifact.valid_train_file_path)
             test_df = DataTransformation.read_data(self.data_validation_artifact.valid_test_file_path)
 
             # Split input and target
-            input_feature_train_df = train_df.drop(columns=[TARGET_COLUMN], axis=1)
+            input_feature_train_df = train_df.drop(columns=[TARGET_COLUMN])
             target_feature_train_df = train_df[TARGET_COLUMN].replace(-1, 0)
 
-            input_feature_test_df = test_df.drop(columns=[TARGET_COLUMN], axis=1)
+            input_feature_test_df = test_df.drop(columns=[TARGET_COLUMN])
             target_feature_test_df = test_df[TARGET_COLUMN].replace(-1, 0)
 
             # Load preprocessing pipeline
@@ -77,18 +85,23 @@ class DataTransformation:
             transformed_input_train_feature = preprocessor_object.transform(input_feature_train_df)
             transformed_input_test_feature = preprocessor_object.transform(input_feature_test_df)
 
-            # Concatenate features and target
-            train_arr = np.c_[transformed_input_train_feature, np.array(target_feature_train_df)]
-            test_arr = np.c_[transformed_input_test_feature, np.array(target_feature_test_df)]
-
-            # Save transformed data arrays
+            # Save features and target as separate compact arrays (int8 when
+            # lossless) so the trainer can memory-map them without slicing
             save_numpy_array_data(
                 self.data_transformation_config.transformed_train_file_path,
-                array=train_arr,
+                array=compact_array(transformed_input_train_feature),
+            )
+            save_numpy_array_data(
+                self.data_transformation_config.transformed_train_label_file_path,
+                array=compact_array(target_feature_train_df.to_numpy()),
             )
             save_numpy_array_data(
                 self.data_transformation_config.transformed_test_file_path,
-                array=test_arr,
+                array=compact_array(transformed_input_test_feature),
+            )
+            save_numpy_array_data(
+                self.data_transformation_config.transformed_test_label_file_path,
+                array=compact_array(target_feature_test_df.to_numpy()),
             )
 
             # Save preprocessing object
@@ -99,15 +112,26 @@ class DataTransformation:
 
             
 
-            # Optional: Save final model folder preprocessor
-            os.makedirs("final_model", exist_ok=True)
-            save_object("final_model/preprocessor.pkl", preprocessor_object)
+            # Reference distribution of the raw training features for drift monitoring
+            feature_baseline = build_feature_baseline(input_feature_train_df)
+            save_object(self.data_transformation_config.feature_baseline_file_path, feature_baseline)
+
+            # Distinct packed training feature vectors, the served lookup table starts from them
+            keys, packable = pack_feature_vectors(
+                np.concatenate([input_feature_train_df.to_numpy(), input_feature_test_df.to_numpy()])
+            )
+            feature_keys = np.unique(keys[packable])
+            save_numpy_array_data(self.data_transformation_config.feature_keys_file_path, feature_keys)
 
             # Prepare artifact
             data_transformation_artifact = DataTransformationArtifact(
                 transformed_object_file_path=self.data_transformation_config.transformed_object_file_path,
                 transformed_train_file_path=self.data_transformation_config.transformed_train_file_path,
-                transformed_test_file_path=self.data_transformation_config.transformed_test_file_path
+                transformed_test_file_path=self.data_transformation_config.transformed_test_file_path,
+                feature_baseline_file_path=self.data_transformation_config.feature_baseline_file_path,
+                transformed_train_label_file_path=self.data_transformation_config.transformed_train_label_file_path,
+                transformed_test_label_file_path=self.data_transformation_config.transformed_test_label_file_path,
+                feature_keys_file_path=self.data_transformation_config.feature_keys_file_path,
             )
 
             logging.info("Data Transformation completed successfully.")
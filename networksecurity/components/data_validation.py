@@ -3,10 +3,13 @@ from networksecurity.entity.config_entity import DataValidationConfig
 from networksecurity.exception.exception import NetworkSecurityException 
 from networksecurity.logging.logger import logging 
 from networksecurity.constant.training_pipeline import SCHEMA_FILE_PATH
-from scipy.stats import ks_2samp
+import numpy as np
 import pandas as pd
 import os, sys
-from networksecurity.utils.main_utils.utils import read_yaml_file, write_yaml_file
+from networksecurity.utils.main_utils.utils import (
+    read_yaml_file, write_yaml_file, read_dataframe, link_or_copy_file
+)
+from networksecurity.utils.ml_utils.metric.drift_metric import drift_p_values, sample_rows
 
 
 class DataValidation:
@@ -24,7 +27,7 @@ class DataValidation:
     @staticmethod
     def read_data(file_path) -> pd.DataFrame:
         try:
-            return pd.read_csv(file_path)
+            return read_dataframe(file_path)
         except Exception as e:
             raise NetworkSecurityException(e, sys)
 
@@ -44,12 +47,12 @@ class DataValidation:
             if list(dataframe.columns) != schema_cols:
                 return False
 
-            # Check numerical types
+            # Check numerical types, by kind: int8 artifacts satisfy int64
             for col, expected_type in schema_types.items():
                 if col not in dataframe.columns:
                     return False
                 actual_type = str(dataframe[col].dtype)
-                if actual_type != expected_type:
+                if dataframe[col].dtype.kind != np.dtype(expected_type).kind:
                     logging.info(f"Column {col} has type {actual_type}, expected {expected_type}")
                     return False
 
@@ -60,26 +63,26 @@ class DataValidation:
 
     def detect_dataset_drift(self, base_df: pd.DataFrame, current_df: pd.DataFrame, threshold=0.05) -> bool:
         """
-        Detect drift using KS test. Returns True if no drift, False if drift detected.
+        Detect drift using KS test (or chi-square) on per-column value histograms,
+        all columns at once. Returns True if no drift, False if drift detected.
         """
         try:
-            status = True
-            report = {}
-
-            for column in base_df.columns:
-                d1 = base_df[column]
-                d2 = current_df[column]
-
-                ks_result = ks_2samp(d1, d2)
-                drift_found = ks_result.pvalue < threshold
-
-                if drift_found:
-                    status = False
+            columns = list(base_df.columns)
+            sample_size = self.data_validation_config.drift_sample_size
+            # sample rows first, so only the sampled rows are converted to float64
+            p_values = drift_p_values(
+                sample_rows(base_df, sample_size)[columns].to_numpy(dtype=np.float64),
+                sample_rows(current_df, sample_size)[columns].to_numpy(dtype=np.float64),
+                method=self.data_validation_config.drift_method,
+            )
 
+            report = {}
+            for column, p_value in zip(columns, p_values):
                 report[column] = {
-                    "p_value": float(ks_result.pvalue),
-                    "drift_status": drift_found
+                    "p_value": float(p_value),
+                    "drift_status": bool(p_value < threshold)
                 }
+            status = not any(column_report["drift_status"] for column_report in report.values())
 
             # Save drift report
             drift_report_file_path = self.data_validation_config.drift_report_file_path
@@ -115,10 +118,12 @@ class DataValidation:
             # Detect dataset drift
             drift_status = self.detect_dataset_drift(train_df, test_df)
 
-            # Save validated data
-            os.makedirs(os.path.dirname(self.data_validation_config.valid_train_file_path), exist_ok=True)
-            train_df.to_csv(self.data_validation_config.valid_train_file_path, index=False)
-            test_df.to_csv(self.data_validation_config.valid_test_file_path, index=False)
+            # Validation does not change the data, so the validated files are
+            # links to the ingested ones instead of rewritten copies
+            link_or_copy_file(self.data_ingestion_artifact.training_file_path,
+                              self.data_validation_config.valid_train_file_path)
+            link_or_copy_file(self.data_ingestion_artifact.test_file_path,
+                              self.data_validation_config.valid_test_file_path)
 
             logging.info("Data validation passed. Saving validated data.")
 
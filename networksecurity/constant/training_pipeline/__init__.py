@@ -14,8 +14,11 @@ PIPELINE_NAME = "NetworkSecurity"
 # Use a single consistent artifact folder name
 ARTIFACT_NAME = "Artifacts"
 FILE_NAME = "phisingData.csv"
-TRAIN_FILE_NAME = "train.csv"
-TEST_FILE_NAME = "test.csv"
+# stage data artifacts are Parquet with int8 columns
+TRAIN_FILE_NAME = "train.parquet"
+TEST_FILE_NAME = "test.parquet"
+# fingerprint -> artifact index, lets unchanged stages reuse earlier runs
+STAGE_CACHE_DIR_NAME = "stage_cache"
 
 """
 Data Ingestion related constants start with DATA_INGESTION_* 
@@ -27,15 +30,67 @@ DATA_INGESTION_DATABASE_NAME = "netsec"
 DATA_INGESTION_DIR_NAME = "data_ingestion"
 
 DATA_INGESTION_FEATURE_STORE_DIR = "feature_store"
+# last ingested _id, row count and partition files of the feature store
+DATA_INGESTION_WATERMARK_FILE_NAME = "watermark.pkl"
 DATA_INGESTION_INGESTED_DIR = "ingested"
 
 # Correct spelling
 DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO = 0.20
+# documents fetched per cursor round-trip
+DATA_INGESTION_CURSOR_BATCH_SIZE: int = 10_000
+# number of _id ranges of the collection read in parallel
+DATA_INGESTION_N_READERS: int = 1
 
 SCHEMA_FILE_PATH = os.path.join("data_schema","schema.yaml")
 SAVED_MODEL_DIR = os.path.join("saved_models")
 MODEL_FILE_NAME = "model.pkl"
 
+"""
+Final model served by the web app and used for batch prediction
+"""
+FINAL_MODEL_DIR = "final_model"
+FINAL_MODEL_FILE_PATH = os.path.join(FINAL_MODEL_DIR, "model.pkl")
+FINAL_PREPROCESSOR_FILE_PATH = os.path.join(FINAL_MODEL_DIR, "preprocessor.pkl")
+# value counts of the training features, the reference for drift monitoring
+FINAL_FEATURE_BASELINE_FILE_PATH = os.path.join(FINAL_MODEL_DIR, "feature_baseline.pkl")
+# packed distinct training feature vectors, prefilled into the served lookup table
+FINAL_FEATURE_KEYS_FILE_PATH = os.path.join(FINAL_MODEL_DIR, "feature_keys.npy")
+# written last when a training run publishes final_model/, its version is the
+# one the web app serves; the other files are only read once it changes
+FINAL_MODEL_MANIFEST_FILE_PATH = os.path.join(FINAL_MODEL_DIR, "manifest.json")
+# seconds between checks of final_model/ for a retrained model
+MODEL_RELOAD_INTERVAL: float = 30.0
+
+"""
+Batch prediction related constants start with BATCH_PREDICTION VAR NAME
+"""
+PREDICTION_OUTPUT_DIR = "prediction_output"
+PREDICTION_OUTPUT_FILE_NAME = "output.csv"
+BATCH_PREDICTION_CHUNK_SIZE: int = 100_000
+BATCH_PREDICTION_N_WORKERS: int = 1
+BATCH_PREDICTION_COLUMN_NAME: str = "prediction"
+# seconds a web batch result file stays downloadable
+PREDICTION_OUTPUT_TTL: float = 60 * 60
+
+"""
+Prediction cache related constants start with PREDICTION_CACHE VAR NAME
+"""
+PREDICTION_CACHE_MAX_SIZE: int = 100_000
+PREDICTION_CACHE_TTL: float = 60 * 60
+# verdicts kept per distinct packed feature vector, see LookupTableScorer
+LOOKUP_TABLE_MAX_SIZE: int = 500_000
+
+"""
+Drift monitoring of served features, constants start with DRIFT_MONITOR VAR NAME
+"""
+# the window is n_buckets time buckets of bucket_seconds each
+DRIFT_MONITOR_BUCKET_SECONDS: float = 5 * 60
+DRIFT_MONITOR_N_BUCKETS: int = 12
+# PSI above this flags a feature (0.1-0.2 moderate, > 0.2 significant shift)
+DRIFT_MONITOR_PSI_THRESHOLD: float = 0.2
+# rows needed in the window before any feature is flagged
+DRIFT_MONITOR_MIN_OBSERVATIONS: int = 200
+
 """
 Data Validation related constants start with DATA_VALIDATION VAR NAME
 """
@@ -44,11 +99,17 @@ DATA_VALIDATION_VALID_DIR = "validated"
 DATA_VALIDATION_INVALID_DIR = "invalid"
 DATA_VALIDATION_DRIFT_REPORT_DIR = "drift_report"
 DATA_VALIDATION_DRIFT_REPORT_FILE_NAME = "report.yaml"
+# test run on the per-column value histograms: "ks" or "chi2"
+DATA_VALIDATION_DRIFT_METHOD: str = "ks"
+# rows sampled from each frame before testing, None tests every row
+DATA_VALIDATION_DRIFT_SAMPLE_SIZE: int = None
 
 """
 Data Transformation related constant start with DATA_TRANSFORMATION VAR NAME
 """
 PREPROCESSING_OBJECT_FILE_NAME = "preprocessing.pkl"
+FEATURE_BASELINE_FILE_NAME = "feature_baseline.pkl"
+FEATURE_KEYS_FILE_NAME = "feature_keys.npy"
 DATA_TRANSFORMATION_DIR_NAME: str = "data_transformation"
 DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR: str = "transformed"
 DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR: str = "transformed_object"
@@ -59,9 +120,15 @@ DATA_TRANSFORMATION_IMPUTER_PARAMS: dict = {
     "n_neighbors": 3,
     "weights": "uniform",
 }
+# KNN imputation is only fitted when more than this fraction of the training
+# rows has a missing value, otherwise the most frequent value is used
+DATA_TRANSFORMATION_MAX_MISSING_ROW_FRACTION: float = 0.01
 DATA_TRANSFORMATION_TRAIN_FILE_PATH: str = "train.npy"
 
 DATA_TRANSFORMATION_TEST_FILE_PATH: str = "test.npy"
+# transformed labels are stored apart from the features, both as compact .npy
+DATA_TRANSFORMATION_TRAIN_LABEL_FILE_NAME: str = "train_label.npy"
+DATA_TRANSFORMATION_TEST_LABEL_FILE_NAME: str = "test_label.npy"
 
 """
 MODEL TRAINING related constant start with MODEL_TRAINING VAR NAME
@@ -70,4 +137,23 @@ MODEL_TRAINER_DIR_NAME: str = "model_trainer"
 MODEL_TRAINER_TRAINED_MODEL_DIR: str = "trained_model"
 MODEL_TRAINER_TRAINED_MODEL_NAME: str = "model.pkl"
 MODEL_TRAINER_EXPECTED_SCORE: float = 0.6
-MODEL_TRAINER_OVER_FITTING_UNDER_FITTING_THRESHOLD: float = 0.05
\ No newline at end of file
+MODEL_TRAINER_OVER_FITTING_UNDER_FITTING_THRESHOLD: float = 0.05
+# hyperparameter search: "grid", "halving" or "staged", cores (-1 = all), seconds per family (None = no limit)
+MODEL_TRAINER_SEARCH_STRATEGY: str = "staged"
+MODEL_TRAINER_SEARCH_N_JOBS: int = -1
+MODEL_TRAINER_SEARCH_TIME_BUDGET: float = None
+# boosting stops after this many stages without improvement on a validation hold-out (None = never)
+MODEL_TRAINER_EARLY_STOPPING_ROUNDS: int = 10
+MODEL_TRAINER_VALIDATION_FRACTION: float = 0.1
+
+"""
+Experiment tracking related constants start with MLFLOW VAR NAME
+"""
+MLFLOW_DAGSHUB_REPO_OWNER: str = "djain28006"
+MLFLOW_DAGSHUB_REPO_NAME: str = "networksecurity"
+MLFLOW_REMOTE_HOST: str = "dagshub.com"
+# seconds to wait for the remote host before tracking locally
+MLFLOW_REMOTE_TIMEOUT: float = 5.0
+MLFLOW_LOCAL_TRACKING_URI: str = "sqlite:///mlflow.db"
+# seconds a finished process waits for queued runs to be logged
+MLFLOW_FLUSH_TIMEOUT: float = 120.0
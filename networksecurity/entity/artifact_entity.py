@@ -20,6 +20,11 @@ class DataTransformationArtifact:
     transformed_object_file_path: str
     transformed_train_file_path: str
     transformed_test_file_path: str
+    feature_baseline_file_path: str = None
+    # None for artifacts that store the label as the last column of the features
+    transformed_train_label_file_path: str = None
+    transformed_test_label_file_path: str = None
+    feature_keys_file_path: str = None
 
 @dataclass
 class ClassificationMetricArtifact:
@@ -31,4 +36,11 @@ class ClassificationMetricArtifact:
 class ModelTrainerArtifact:
     trained_model_file_path:str
     train_metric_artifact:ClassificationMetricArtifact
-    test_metric_artifact:ClassificationMetricArtifact
\ No newline at end of file
+    test_metric_artifact:ClassificationMetricArtifact
+
+@dataclass
+class BatchPredictionArtifact:
+    output_file_path: str
+    total_rows: int
+    elapsed_seconds: float
+    rows_per_second: float
@@ -21,9 +21,6 @@ class DataIngestionConfig:
         self.data_ingestion_dir:str=os.path.join(
             training_pipeline_config.artifact_dir,training_pipeline.DATA_INGESTION_DIR_NAME
         )
-        self.feature_store_file_path: str = os.path.join(
-                self.data_ingestion_dir, training_pipeline.DATA_INGESTION_FEATURE_STORE_DIR, training_pipeline.FILE_NAME
-            )
         self.training_file_path: str = os.path.join(
                 self.data_ingestion_dir, training_pipeline.DATA_INGESTION_INGESTED_DIR, training_pipeline.TRAIN_FILE_NAME
             )
@@ -33,6 +30,16 @@ class DataIngestionConfig:
         self.train_test_split_ratio: float = training_pipeline.DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO
         self.collection_name: str = training_pipeline.DATA_INGESTION_COLLECTION_NAME
         self.database_name: str = training_pipeline.DATA_INGESTION_DATABASE_NAME
+        self.cursor_batch_size: int = training_pipeline.DATA_INGESTION_CURSOR_BATCH_SIZE
+        self.n_readers: int = training_pipeline.DATA_INGESTION_N_READERS
+        # shared by every run, so each run only ingests new documents
+        self.feature_store_dir: str = os.path.join(
+                training_pipeline_config.artifact_name, training_pipeline.DATA_INGESTION_FEATURE_STORE_DIR,
+                self.database_name, self.collection_name
+            )
+        self.watermark_file_path: str = os.path.join(
+                self.feature_store_dir, training_pipeline.DATA_INGESTION_WATERMARK_FILE_NAME
+            )
 
 
 class DataValidationConfig:
@@ -79,6 +86,9 @@ class DataValidationConfig:
                 training_pipeline.DATA_VALIDATION_DRIFT_REPORT_FILE_NAME
             )
 
+            self.drift_method: str = training_pipeline.DATA_VALIDATION_DRIFT_METHOD
+            self.drift_sample_size: int = training_pipeline.DATA_VALIDATION_DRIFT_SAMPLE_SIZE
+
 
 
         except Exception as e:
@@ -89,11 +99,19 @@ class DataTransformationConfig:
     def __init__(self,training_pipeline_config:TrainingPipelineConfig):
         self.data_transformation_dir: str = os.path.join( training_pipeline_config.artifact_dir,training_pipeline.DATA_TRANSFORMATION_DIR_NAME )
         self.transformed_train_file_path: str = os.path.join( self.data_transformation_dir,training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
-            training_pipeline.TRAIN_FILE_NAME.replace("csv", "npy"),)
+            training_pipeline.TRAIN_FILE_NAME.replace("parquet", "npy"),)
         self.transformed_test_file_path: str = os.path.join(self.data_transformation_dir,  training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
-            training_pipeline.TEST_FILE_NAME.replace("csv", "npy"), )
+            training_pipeline.TEST_FILE_NAME.replace("parquet", "npy"), )
+        self.transformed_train_label_file_path: str = os.path.join( self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
+            training_pipeline.DATA_TRANSFORMATION_TRAIN_LABEL_FILE_NAME,)
+        self.transformed_test_label_file_path: str = os.path.join( self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
+            training_pipeline.DATA_TRANSFORMATION_TEST_LABEL_FILE_NAME,)
         self.transformed_object_file_path: str = os.path.join( self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,
             training_pipeline.PREPROCESSING_OBJECT_FILE_NAME,)
+        self.feature_baseline_file_path: str = os.path.join( self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,
+            training_pipeline.FEATURE_BASELINE_FILE_NAME,)
+        self.feature_keys_file_path: str = os.path.join( self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,
+            training_pipeline.FEATURE_KEYS_FILE_NAME,)
 
 class ModelTrainerConfig:
     def __init__(self,training_pipeline_config:TrainingPipelineConfig):
@@ -106,3 +124,26 @@ class ModelTrainerConfig:
         )
         self.expected_accuracy:float = training_pipeline.MODEL_TRAINER_EXPECTED_SCORE
         self.overfitting_underfitting_threshold: float = training_pipeline.MODEL_TRAINER_OVER_FITTING_UNDER_FITTING_THRESHOLD
+        self.search_strategy: str = training_pipeline.MODEL_TRAINER_SEARCH_STRATEGY
+        self.search_n_jobs: int = training_pipeline.MODEL_TRAINER_SEARCH_N_JOBS
+        self.search_time_budget: float = training_pipeline.MODEL_TRAINER_SEARCH_TIME_BUDGET
+        self.early_stopping_rounds: int = training_pipeline.MODEL_TRAINER_EARLY_STOPPING_ROUNDS
+        self.validation_fraction: float = training_pipeline.MODEL_TRAINER_VALIDATION_FRACTION
+
+
+class BatchPredictionConfig:
+    def __init__(self, input_file_path: str, output_file_path: str = None,
+                 chunk_size: int = training_pipeline.BATCH_PREDICTION_CHUNK_SIZE,
+                 n_workers: int = training_pipeline.BATCH_PREDICTION_N_WORKERS):
+        try:
+            self.input_file_path: str = input_file_path
+            self.output_file_path: str = output_file_path or os.path.join(
+                training_pipeline.PREDICTION_OUTPUT_DIR, training_pipeline.PREDICTION_OUTPUT_FILE_NAME
+            )
+            self.chunk_size: int = chunk_size
+            self.n_workers: int = n_workers
+            self.preprocessor_file_path: str = training_pipeline.FINAL_PREPROCESSOR_FILE_PATH
+            self.model_file_path: str = training_pipeline.FINAL_MODEL_FILE_PATH
+            self.prediction_column_name: str = training_pipeline.BATCH_PREDICTION_COLUMN_NAME
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
@@ -0,0 +1,344 @@
+import os
+import sys
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+from networksecurity.constant.training_pipeline import (
+    SCHEMA_FILE_PATH,
+    TARGET_COLUMN,
+    BATCH_PREDICTION_CHUNK_SIZE,
+    BATCH_PREDICTION_N_WORKERS,
+)
+from networksecurity.entity.config_entity import BatchPredictionConfig
+from networksecurity.entity.artifact_entity import BatchPredictionArtifact
+from networksecurity.utils.main_utils.utils import load_object, read_yaml_file
+from networksecurity.utils.ml_utils.model.estimator import NetworkModel
+from networksecurity.utils.ml_utils.feature_engine import FeatureExtractionEngine
+from networksecurity.utils.ml_utils.feature_extractor import FEATURE_COLUMNS, url_error
+from networksecurity.utils.ml_utils.lexical_features import lexical_only_features
+from networksecurity.utils.ml_utils.prediction_cache import PredictionCache
+from networksecurity.utils.ml_utils.drift_monitor import FeatureDriftMonitor
+from networksecurity.utils.ml_utils.model.lookup_scorer import LookupTableScorer
+
+"""
+this file holds the batch prediction entry points
+UrlBatchPredictor scores a list of URLs: features for every URL are
+extracted concurrently, stacked into one feature matrix and passed
+through the preprocessor and model in a single predict call; in
+lexical-only mode the features come from the URL strings alone
+verdicts of full extractions are served from a PredictionCache when given,
+and their feature vectors are fed to a FeatureDriftMonitor when given;
+with a LookupTableScorer feature vectors seen before skip the model
+a URL that cannot be parsed gets an "Error" verdict, the rest of its batch
+is scored as usual
+BatchPredictionPipeline scores a CSV/Parquet file that is already in the
+schema.yaml feature layout, chunk by chunk, so memory stays flat no
+matter how large the input is
+"""
+
+# Model output -> verdict shown to users
+PREDICTION_LABELS = {0: "Safe", 1: "Phishing"}
+# result of a URL that could not be scored
+PREDICTION_ERROR_LABEL = "Error"
+
+# Largest number of URLs accepted in one batch request
+URL_BATCH_MAX_SIZE = 1000
+
+
+class UrlBatchPredictor:
+    def __init__(self, network_model, feature_engine: FeatureExtractionEngine = None,
+                 prediction_cache: PredictionCache = None,
+                 drift_monitor: FeatureDriftMonitor = None,
+                 lookup_scorer: LookupTableScorer = None):
+        try:
+            self.network_model = network_model
+            self.feature_engine = feature_engine if feature_engine is not None else FeatureExtractionEngine()
+            self.prediction_cache = prediction_cache
+            self.drift_monitor = drift_monitor
+            self.lookup_scorer = lookup_scorer
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def predict(self, urls: list, lexical_only: bool = False) -> list:
+        """
+        Score every URL and return one verdict dict per URL, in input order.
+        Duplicate URLs are extracted and scored once.
+        lexical_only skips every network call: the network-bound features
+        take their fallback values, which makes this a cheap pre-filter.
+        """
+        try:
+            if not urls:
+                return []
+
+            unique_urls = list(dict.fromkeys(urls))
+            # the model can be swapped by a reload while this batch runs
+            network_model = self.network_model
+            use_cache = self.prediction_cache is not None and not lexical_only
+
+            verdicts = {}
+            if use_cache:
+                for url in unique_urls:
+                    verdict = self.prediction_cache.get(url)
+                    if verdict is not None:
+                        verdicts[url] = verdict
+            pending_urls = [url for url in unique_urls if url not in verdicts]
+
+            if pending_urls:
+                verdicts.update(self._score(network_model, pending_urls, lexical_only))
+                if use_cache and network_model is self.network_model:
+                    for url in pending_urls:
+                        # degraded verdicts are not worth keeping
+                        if not verdicts[url]["timed_out"] and "error" not in verdicts[url]:
+                            self.prediction_cache.set(url, verdicts[url])
+
+            return [dict(verdicts[url], url=url) for url in urls]
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def _score(self, network_model, urls: list, lexical_only: bool) -> dict:
+        verdicts = {}
+        if lexical_only:
+            errors = [url_error(url) for url in urls]
+        else:
+            extractions = self.feature_engine.extract_many(urls)
+            errors = [extraction.error for extraction in extractions]
+            extractions = [extraction for extraction in extractions if extraction.error is None]
+
+        for url, error in zip(urls, errors):
+            if error is not None:
+                verdicts[url] = {
+                    "url": url,
+                    "prediction": None,
+                    "result": PREDICTION_ERROR_LABEL,
+                    "error": error,
+                    "timed_out": [],
+                }
+        urls = [url for url, error in zip(urls, errors) if error is None]
+        if not urls:
+            return verdicts
+
+        if lexical_only:
+            features_df = lexical_only_features(urls)
+            timed_out = [[] for _ in urls]
+        else:
+            features_df = pd.DataFrame(
+                [extraction.features for extraction in extractions],
+                columns=FEATURE_COLUMNS,
+            )
+            timed_out = [extraction.timed_out for extraction in extractions]
+            if self.drift_monitor is not None:
+                self.drift_monitor.observe(features_df)
+
+        # the scorer serves one model; during a reload the batch keeps its own
+        if self.lookup_scorer is not None and self.lookup_scorer.network_model is network_model:
+            y_pred = self.lookup_scorer.predict(features_df)
+        else:
+            y_pred = network_model.predict(features_df)
+        logging.info(f"Scored a batch of {len(urls)} unique URLs (lexical_only={lexical_only})")
+
+        for url, url_timed_out, prediction in zip(urls, timed_out, y_pred):
+            prediction = int(prediction)
+            verdicts[url] = {
+                "url": url,
+                "prediction": prediction,
+                "result": PREDICTION_LABELS[prediction],
+                "timed_out": url_timed_out,
+            }
+        return verdicts
+
+
+# --------------------------
+# Offline file scoring
+# --------------------------
+_worker_model = None
+
+
+def _init_worker(preprocessor_file_path: str, model_file_path: str):
+    """Load the model once per worker process"""
+    global _worker_model
+    _worker_model = NetworkModel(
+        preprocessor=load_object(preprocessor_file_path),
+        model=load_object(model_file_path),
+    )
+
+
+def _predict_chunk(features: pd.DataFrame):
+    return _worker_model.predict(features)
+
+
+class _ChunkWriter:
+    """
+    Appends scored chunks to a CSV or Parquet output file.
+    Parquet columns get the fixed types of column_types (name -> pyarrow
+    type), so a chunk whose "na" values turned a column to float64 is
+    written with the same schema as the chunks before it.
+    """
+    def __init__(self, file_path: str, column_types: dict = None):
+        self.file_path = file_path
+        self.is_parquet = file_path.endswith(".parquet")
+        self.column_types = column_types or {}
+        self._parquet_schema = None
+        self._parquet_writer = None
+        self._header_written = False
+        dir_path = os.path.dirname(file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    def write(self, chunk: pd.DataFrame):
+        if self.is_parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._parquet_schema is None:
+                inferred = pa.Schema.from_pandas(chunk, preserve_index=False)
+                self._parquet_schema = pa.schema([
+                    pa.field(name, self.column_types.get(name, inferred.field(name).type))
+                    for name in chunk.columns
+                ])
+                self._parquet_writer = pq.ParquetWriter(self.file_path, self._parquet_schema)
+            table = pa.Table.from_pandas(chunk, schema=self._parquet_schema, preserve_index=False)
+            self._parquet_writer.write_table(table)
+        else:
+            chunk.to_csv(self.file_path, mode="a", index=False, header=not self._header_written)
+            self._header_written = True
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+class BatchPredictionPipeline:
+    def __init__(self, batch_prediction_config: BatchPredictionConfig):
+        try:
+            self.batch_prediction_config = batch_prediction_config
+            schema_config = read_yaml_file(SCHEMA_FILE_PATH)
+            self.schema_columns = [list(col.keys())[0] for col in schema_config["columns"]]
+            self.feature_columns = [col for col in self.schema_columns if col != TARGET_COLUMN]
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def iter_chunks(self):
+        """
+        Yield the input file as DataFrames of at most chunk_size rows,
+        keeping only the schema columns.
+        """
+        input_file_path = self.batch_prediction_config.input_file_path
+        chunk_size = self.batch_prediction_config.chunk_size
+
+        if input_file_path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            parquet_file = pq.ParquetFile(input_file_path)
+            columns = [col for col in parquet_file.schema_arrow.names if col in self.schema_columns]
+            for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(
+                input_file_path,
+                chunksize=chunk_size,
+                usecols=lambda col: col in self.schema_columns,
+                na_values=["na"],
+            )
+
+    def output_column_types(self) -> dict:
+        """
+        Parquet types of the output columns: nullable int8 for the schema
+        columns (every value is in {-1, 0, 1}, missing ones become null)
+        and int64 for the prediction.
+        """
+        import pyarrow as pa
+
+        column_types = {col: pa.int8() for col in self.schema_columns}
+        column_types[self.batch_prediction_config.prediction_column_name] = pa.int64()
+        return column_types
+
+    def _score_chunks(self, chunks):
+        """
+        Yield (chunk, predictions) in input order. With several workers at
+        most two chunks per worker are in flight, which bounds memory.
+        """
+        config = self.batch_prediction_config
+
+        if config.n_workers <= 1:
+            _init_worker(config.preprocessor_file_path, config.model_file_path)
+            for chunk in chunks:
+                yield chunk, _predict_chunk(chunk[self.feature_columns])
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=config.n_workers,
+            initializer=_init_worker,
+            initargs=(config.preprocessor_file_path, config.model_file_path),
+        ) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append((chunk, executor.submit(_predict_chunk, chunk[self.feature_columns])))
+                if len(pending) >= 2 * config.n_workers:
+                    chunk, future = pending.popleft()
+                    yield chunk, future.result()
+            while pending:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+
+    def run_pipeline(self) -> BatchPredictionArtifact:
+        try:
+            config = self.batch_prediction_config
+            logging.info(f"Batch prediction started: {config.input_file_path} -> {config.output_file_path}")
+
+            writer = _ChunkWriter(
+                config.output_file_path,
+                column_types=self.output_column_types() if config.output_file_path.endswith(".parquet") else None,
+            )
+            total_rows = 0
+            started = time.perf_counter()
+            try:
+                for chunk, predictions in self._score_chunks(self.iter_chunks()):
+                    chunk[config.prediction_column_name] = predictions.astype("int64")
+                    writer.write(chunk)
+                    total_rows += len(chunk)
+                    elapsed = time.perf_counter() - started
+                    logging.info(f"Scored {total_rows} rows ({total_rows / elapsed:.0f} rows/s)")
+            finally:
+                writer.close()
+
+            elapsed = time.perf_counter() - started
+            batch_prediction_artifact = BatchPredictionArtifact(
+                output_file_path=config.output_file_path,
+                total_rows=total_rows,
+                elapsed_seconds=elapsed,
+                rows_per_second=total_rows / elapsed if elapsed else 0.0,
+            )
+            logging.info(f"Batch prediction completed: {batch_prediction_artifact}")
+
+            return batch_prediction_artifact
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet file with the final model")
+    parser.add_argument("input_file_path")
+    parser.add_argument("output_file_path", nargs="?")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_PREDICTION_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=BATCH_PREDICTION_N_WORKERS)
+    args = parser.parse_args()
+
+    artifact = BatchPredictionPipeline(
+        BatchPredictionConfig(
+            input_file_path=args.input_file_path,
+            output_file_path=args.output_file_path,
+            chunk_size=args.chunk_size,
+            n_workers=args.workers,
+        )
+    ).run_pipeline()
+    print(artifact)
@@ -0,0 +1,79 @@
+import os
+import sys
+import hashlib
+import inspect
+from dataclasses import fields, is_dataclass
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+from networksecurity.constant.training_pipeline import ARTIFACT_NAME, STAGE_CACHE_DIR_NAME
+from networksecurity.utils.main_utils.utils import compute_file_hash, save_object, load_object
+
+"""
+this file lets TrainingPipeline skip stages whose inputs did not change
+a stage fingerprint is the hash of its input files (by content), its
+config values and the source of the component that runs it and of every
+module holding code the component calls
+finished artifacts are indexed by fingerprint under Artifacts/stage_cache,
+so a later run with the same fingerprint reuses them instead of recomputing
+"""
+
+
+def _artifact_file_paths(artifact):
+    if not is_dataclass(artifact):
+        return []
+    paths = []
+    for f in fields(artifact):
+        value = getattr(artifact, f.name)
+        if f.name.endswith("_file_path") and value:
+            paths.append(value)
+        paths.extend(_artifact_file_paths(value))
+    return paths
+
+
+class StageCache:
+    def __init__(self, cache_dir: str = os.path.join(ARTIFACT_NAME, STAGE_CACHE_DIR_NAME)):
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def fingerprint(*parts) -> str:
+        """
+        Hash of every part: files by content, classes, functions and modules
+        by the source file they are defined in, anything else by repr.
+        """
+        try:
+            digest = hashlib.sha256()
+            for part in parts:
+                if isinstance(part, str) and os.path.isfile(part):
+                    part = compute_file_hash(part)
+                elif inspect.isclass(part) or inspect.isfunction(part) or inspect.ismodule(part):
+                    part = compute_file_hash(inspect.getsourcefile(part))
+                digest.update(repr(part).encode())
+                digest.update(b"\0")
+            return digest.hexdigest()
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def _index_file_path(self, stage: str, fingerprint: str) -> str:
+        return os.path.join(self.cache_dir, stage, f"{fingerprint}.pkl")
+
+    def load(self, stage: str, fingerprint: str):
+        """
+        Artifact of an earlier run with this fingerprint, or None.
+        Entries whose files have been deleted are ignored.
+        """
+        index_file_path = self._index_file_path(stage, fingerprint)
+        if not os.path.exists(index_file_path):
+            return None
+        try:
+            artifact = load_object(index_file_path)
+        except Exception as e:
+            logging.info(f"Unreadable stage cache entry {index_file_path}: {e}")
+            return None
+        if not all(os.path.exists(path) for path in _artifact_file_paths(artifact)):
+            return None
+        logging.info(f"Reusing cached {stage} artifact {fingerprint[:12]}: {artifact}")
+        return artifact
+
+    def save(self, stage: str, fingerprint: str, artifact) -> None:
+        save_object(self._index_file_path(stage, fingerprint), artifact)
@@ -1,8 +1,31 @@
 import os
 import sys
+import datetime
 
 from networksecurity.exception.exception import NetworkSecurityException
 from networksecurity.logging.logger import logging
+from networksecurity.constant.training_pipeline import (
+    SCHEMA_FILE_PATH,
+    TARGET_COLUMN,
+    DATA_TRANSFORMATION_IMPUTER_PARAMS,
+    DATA_TRANSFORMATION_MAX_MISSING_ROW_FRACTION,
+    FINAL_MODEL_FILE_PATH,
+    FINAL_PREPROCESSOR_FILE_PATH,
+    FINAL_FEATURE_BASELINE_FILE_PATH,
+    FINAL_FEATURE_KEYS_FILE_PATH,
+    FINAL_MODEL_MANIFEST_FILE_PATH,
+)
+from networksecurity.pipeline.stage_cache import StageCache
+from networksecurity.utils.ml_utils.model.imputer import FastPathImputer
+from networksecurity.utils.main_utils.utils import load_object, save_object, save_json_file, compute_file_hash
+from networksecurity.utils.main_utils.utils import load_numpy_array_data, save_numpy_array_data
+from networksecurity.utils.main_utils.utils import compact_array, evaluate_models
+from networksecurity.utils.ml_utils.drift_monitor import build_feature_baseline
+from networksecurity.utils.ml_utils.model.lookup_scorer import pack_feature_vectors
+from networksecurity.utils.ml_utils.model.estimator import NetworkModel
+from networksecurity.utils.ml_utils.model.early_stopping import EarlyStoppingAdaBoostClassifier
+from networksecurity.utils.ml_utils.metric.drift_metric import drift_p_values
+from networksecurity.utils.ml_utils.metric.classification_metric import get_classification_score
 
 from networksecurity.components.data_ingestion import DataIngestion
 from networksecurity.components.data_validation import DataValidation
@@ -27,8 +50,31 @@ from networksecurity.entity.artifact_entity import (
 
 class TrainingPipeline:
 
-    def __init__(self):
+    def __init__(self, use_stage_cache: bool = True):
         self.training_pipeline_config = TrainingPipelineConfig()
+        # reuse artifacts of earlier runs for stages whose inputs are unchanged
+        self.stage_cache = StageCache() if use_stage_cache else None
+
+    def run_stage(self, stage: str, fingerprint_parts, run):
+        """
+        Return the cached artifact for this stage's fingerprint, or run the
+        stage and index its artifact. fingerprint_parts is a callable so
+        that a failure to fingerprint only disables the cache.
+        """
+        if self.stage_cache is None:
+            return run()
+
+        try:
+            fingerprint = StageCache.fingerprint(stage, *fingerprint_parts())
+        except Exception as e:
+            logging.info(f"Could not fingerprint {stage}, running it: {e}")
+            return run()
+
+        artifact = self.stage_cache.load(stage, fingerprint)
+        if artifact is None:
+            artifact = run()
+            self.stage_cache.save(stage, fingerprint, artifact)
+        return artifact
 
     # ---------------------------------------------------------------
     # 1. DATA INGESTION
@@ -45,7 +91,17 @@ class TrainingPipeline:
                 data_ingestion_config=data_ingestion_config
             )
 
-            data_ingestion_artifact = data_ingestion.initiate_data_ingestion()
+            data_ingestion_artifact = self.run_stage(
+                "data_ingestion",
+                lambda: (
+                    DataIngestion,
+                    data_ingestion_config.database_name,
+                    data_ingestion_config.collection_name,
+                    data_ingestion_config.train_test_split_ratio,
+                    data_ingestion.get_collection_summary(),
+                ),
+                data_ingestion.initiate_data_ingestion,
+            )
 
             logging.info(f"Data Ingestion completed: {data_ingestion_artifact}")
 
@@ -73,7 +129,19 @@ class TrainingPipeline:
                 data_validation_config=data_validation_config,
             )
 
-            data_validation_artifact = data_validation.initiate_data_validation()
+            data_validation_artifact = self.run_stage(
+                "data_validation",
+                lambda: (
+                    DataValidation,
+                    drift_p_values,
+                    data_ingestion_artifact.training_file_path,
+                    data_ingestion_artifact.test_file_path,
+                    SCHEMA_FILE_PATH,
+                    data_validation_config.drift_method,
+                    data_validation_config.drift_sample_size,
+                ),
+                data_validation.initiate_data_validation,
+            )
 
             logging.info(f"Data Validation completed: {data_validation_artifact}")
 
@@ -104,8 +172,22 @@ class TrainingPipeline:
                 data_transformation_config=data_transformation_config,
             )
 
-            data_transformation_artifact = (
-                data_transformation.initiate_data_transformation()
+            data_transformation_artifact = self.run_stage(
+                "data_transformation",
+                lambda: (
+                    DataTransformation,
+                    # modules of the code it calls: imputer, baseline, keys, array compaction
+                    FastPathImputer,
+                    build_feature_baseline,
+                    pack_feature_vectors,
+                    compact_array,
+                    data_validation_artifact.valid_train_file_path,
+                    data_validation_artifact.valid_test_file_path,
+                    DATA_TRANSFORMATION_IMPUTER_PARAMS,
+                    DATA_TRANSFORMATION_MAX_MISSING_ROW_FRACTION,
+                    TARGET_COLUMN,
+                ),
+                data_transformation.initiate_data_transformation,
             )
 
             logging.info(
@@ -136,7 +218,28 @@ class TrainingPipeline:
                 model_trainer_config=model_trainer_config,
             )
 
-            model_trainer_artifact = model_trainer.initiate_model_trainer()
+            model_trainer_artifact = self.run_stage(
+                "model_trainer",
+                lambda: (
+                    ModelTrainer,
+                    # modules of the code it calls: search and selection, compiling, metrics
+                    evaluate_models,
+                    EarlyStoppingAdaBoostClassifier,
+                    NetworkModel,
+                    get_classification_score,
+                    data_transformation_artifact.transformed_train_file_path,
+                    data_transformation_artifact.transformed_test_file_path,
+                    data_transformation_artifact.transformed_train_label_file_path,
+                    data_transformation_artifact.transformed_test_label_file_path,
+                    data_transformation_artifact.transformed_object_file_path,
+                    model_trainer.get_models_and_params(),
+                    model_trainer_config.search_strategy,
+                    model_trainer_config.search_time_budget,
+                    model_trainer_config.early_stopping_rounds,
+                    model_trainer_config.validation_fraction,
+                ),
+                model_trainer.initiate_model_trainer,
+            )
 
             logging.info(f"Model Trainer completed: {model_trainer_artifact}")
 
@@ -146,7 +249,53 @@ class TrainingPipeline:
             raise NetworkSecurityException(e, sys)
 
     # ---------------------------------------------------------------
-    # 5. RUN COMPLETE PIPELINE
+    # 5. PUBLISH FINAL MODEL
+    # ---------------------------------------------------------------
+    def publish_final_model(
+        self,
+        data_transformation_artifact: DataTransformationArtifact,
+        model_trainer_artifact: ModelTrainerArtifact,
+    ) -> str:
+        """
+        Write every final_model/ file from this run's artifacts (reused
+        stage artifacts included), then the manifest, last. The web app
+        only reloads when the manifest changes, so it never pairs a new
+        preprocessor with an old model. Returns the published version.
+        """
+        try:
+            # preprocessor and model come from one pickle, so they always match
+            trained_model = load_object(model_trainer_artifact.trained_model_file_path)
+            save_object(FINAL_PREPROCESSOR_FILE_PATH, trained_model.preprocessor)
+            save_object(FINAL_MODEL_FILE_PATH, trained_model.model)
+
+            files = {"preprocessor": FINAL_PREPROCESSOR_FILE_PATH, "model": FINAL_MODEL_FILE_PATH}
+            if data_transformation_artifact.feature_baseline_file_path:
+                save_object(
+                    FINAL_FEATURE_BASELINE_FILE_PATH,
+                    load_object(data_transformation_artifact.feature_baseline_file_path),
+                )
+                files["feature_baseline"] = FINAL_FEATURE_BASELINE_FILE_PATH
+            if data_transformation_artifact.feature_keys_file_path:
+                save_numpy_array_data(
+                    FINAL_FEATURE_KEYS_FILE_PATH,
+                    load_numpy_array_data(data_transformation_artifact.feature_keys_file_path),
+                )
+                files["feature_keys"] = FINAL_FEATURE_KEYS_FILE_PATH
+
+            version = compute_file_hash(FINAL_PREPROCESSOR_FILE_PATH, FINAL_MODEL_FILE_PATH)
+            save_json_file(FINAL_MODEL_MANIFEST_FILE_PATH, {
+                "version": version,
+                "published_at": datetime.datetime.now().isoformat(timespec="seconds"),
+                "files": files,
+            })
+            logging.info(f"Published final model version {version}")
+            return version
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    # ---------------------------------------------------------------
+    # 6. RUN COMPLETE PIPELINE
     # ---------------------------------------------------------------
     def run_pipeline(self) -> ModelTrainerArtifact:
         try:
@@ -163,6 +312,10 @@ class TrainingPipeline:
             model_trainer_artifact = self.start_model_trainer(
                 data_transformation_artifact=data_transformation_artifact
             )
+            self.publish_final_model(
+                data_transformation_artifact=data_transformation_artifact,
+                model_trainer_artifact=model_trainer_artifact,
+            )
 
             logging.info("===== TRAINING PIPELINE COMPLETED =====")
 
@@ -1,14 +1,26 @@
 import yaml
+import json
 from networksecurity.exception import NetworkSecurityException
 from networksecurity.logging.logger import logging
+from networksecurity.utils.ml_utils.model.early_stopping import EarlyStoppingAdaBoostClassifier
 
 import os
 import sys
+import math
+import time
+import shutil
 import numpy as np
+import pandas as pd
 import pickle
+import hashlib
+from joblib.externals.loky import get_reusable_executor
 
-from sklearn.model_selection import GridSearchCV
-from sklearn.metrics import r2_score
+from joblib import Parallel, delayed
+
+from sklearn.base import clone
+from sklearn.ensemble import AdaBoostClassifier
+from sklearn.metrics import f1_score, precision_score, recall_score
+from sklearn.model_selection import GridSearchCV, ParameterGrid, check_cv
 
 def read_yaml_file(file_path: str) -> dict:
     """
@@ -38,6 +50,85 @@ def write_yaml_file(file_path: str, content: object, replace: bool = False) -> N
         raise NetworkSecurityException(e, sys) from e
 
 
+def compact_dataframe(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """
+    Downcast numeric columns to int8 when every value fits, and to float32
+    when the column has missing values. Other columns are kept as they are.
+    """
+    try:
+        compact = {}
+        for col in dataframe.columns:
+            values = dataframe[col]
+            if not pd.api.types.is_numeric_dtype(values):
+                compact[col] = values
+            elif values.notna().all() and values.between(-128, 127).all() and (values % 1 == 0).all():
+                compact[col] = values.astype(np.int8)
+            else:
+                compact[col] = values.astype(np.float32)
+        return pd.DataFrame(compact, index=dataframe.index)
+    except Exception as e:
+        raise NetworkSecurityException(e, sys) from e
+
+
+def write_dataframe(file_path: str, dataframe: pd.DataFrame) -> None:
+    """
+    Write a dataframe artifact: compact Parquet for .parquet paths, CSV otherwise.
+    """
+    try:
+        dir_path = os.path.dirname(file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        if file_path.endswith(".parquet"):
+            compact_dataframe(dataframe).to_parquet(file_path, index=False)
+        else:
+            dataframe.to_csv(file_path, index=False, header=True)
+    except Exception as e:
+        raise NetworkSecurityException(e, sys) from e
+
+
+def read_dataframe(file_path: str, columns: list = None) -> pd.DataFrame:
+    """
+    Read a dataframe artifact written by write_dataframe (Parquet or CSV).
+    """
+    try:
+        if file_path.endswith(".parquet"):
+            return pd.read_parquet(file_path, columns=columns)
+        return pd.read_csv(file_path, usecols=columns)
+    except Exception as e:
+        raise NetworkSecurityException(e, sys) from e
+
+
+def link_or_copy_file(src_file_path: str, dst_file_path: str) -> None:
+    """
+    Make dst_file_path a hard link to src_file_path (no data is copied),
+    falling back to a copy where hard links are not supported.
+    """
+    try:
+        os.makedirs(os.path.dirname(dst_file_path), exist_ok=True)
+        if os.path.exists(dst_file_path):
+            os.remove(dst_file_path)
+        try:
+            os.link(src_file_path, dst_file_path)
+        except OSError:
+            shutil.copyfile(src_file_path, dst_file_path)
+    except Exception as e:
+        raise NetworkSecurityException(e, sys) from e
+
+
+def compact_array(array: np.ndarray) -> np.ndarray:
+    """
+    int8 copy of array when that is lossless, float32 otherwise.
+    """
+    try:
+        array = np.asarray(array)
+        if (array.size and np.isfinite(array).all() and (array % 1 == 0).all()
+                and array.min() >= -128 and array.max() <= 127):
+            return array.astype(np.int8)
+        return array.astype(np.float32)
+    except Exception as e:
+        raise NetworkSecurityException(e, sys) from e
+
+
 def save_numpy_array_data(file_path: str, array: np.array):
     """
     Save a numpy array (.npy file)
@@ -53,11 +144,13 @@ def save_numpy_array_data(file_path: str, array: np.array):
         raise NetworkSecurityException(e, sys) from e
 
 
-def load_numpy_array_data(file_path: str) -> np.array:
+def load_numpy_array_data(file_path: str, mmap_mode: str = None) -> np.array:
     """
-    Load a numpy array (.npy file)
+    Load a numpy array (.npy file), memory-mapped when mmap_mode is given
     """
     try:
+        if mmap_mode:
+            return np.load(file_path, mmap_mode=mmap_mode)
         with open(file_path, "rb") as file_obj:
             return np.load(file_obj)
     except Exception as e:
@@ -67,14 +160,18 @@ def load_numpy_array_data(file_path: str) -> np.array:
 def save_object(file_path: str, obj: object) -> None:
     """
     Save a Python object using pickle.
+    The file is written under a temporary name and renamed, so readers
+    (e.g. the web app reloading final_model/) never see a partial pickle.
     """
     try:
         logging.info("Entered the save_object method")
 
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
-        with open(file_path, "wb") as file_obj:
+        tmp_file_path = f"{file_path}.tmp"
+        with open(tmp_file_path, "wb") as file_obj:
             pickle.dump(obj, file_obj)
+        os.replace(tmp_file_path, file_path)
 
         logging.info("Exited the save_object method")
 
@@ -96,33 +193,290 @@ def load_object(file_path: str) -> object:
     except Exception as e:
         raise NetworkSecurityException(e, sys) from e
 
-def evaluate_models(X_train, y_train,X_test,y_test,models,param):
+def save_json_file(file_path: str, content: dict) -> None:
+    """
+    Save a dictionary as JSON, written under a temporary name and renamed
+    like save_object.
+    """
     try:
-        report = {}
-
-        for i in range(len(list(models))):
-            model = list(models.values())[i]
-            para=param[list(models.keys())[i]]
-
-            gs = GridSearchCV(model,para,cv=3)
-            gs.fit(X_train,y_train)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tmp_file_path = f"{file_path}.tmp"
+        with open(tmp_file_path, "w") as file_obj:
+            json.dump(content, file_obj, indent=2)
+        os.replace(tmp_file_path, file_path)
+    except Exception as e:
+        raise NetworkSecurityException(e, sys) from e
 
-            model.set_params(**gs.best_params_)
-            model.fit(X_train,y_train)
 
-            #model.fit(X_train, y_train)  # Train model
+def load_json_file(file_path: str) -> dict:
+    """
+    Load a JSON file as a dictionary.
+    """
+    try:
+        with open(file_path, "r") as file_obj:
+            return json.load(file_obj)
+    except Exception as e:
+        raise NetworkSecurityException(e, sys) from e
 
-            y_train_pred = model.predict(X_train)
+def compute_file_hash(*file_paths: str) -> str:
+    """
+    SHA-256 of the contents of one or more files, read in blocks.
+    Used as the version of saved model artifacts.
+    """
+    try:
+        digest = hashlib.sha256()
+        for file_path in file_paths:
+            with open(file_path, "rb") as file_obj:
+                for block in iter(lambda: file_obj.read(1 << 20), b""):
+                    digest.update(block)
+        return digest.hexdigest()
+    except Exception as e:
+        raise NetworkSecurityException(e, sys) from e
 
-            y_test_pred = model.predict(X_test)
+# held-out metrics collected for every candidate during cross-validation,
+# candidates and families are ranked by the first one
+MODEL_SELECTION_SCORING = {"f1": "f1", "precision": "precision", "recall": "recall"}
 
-            train_model_score = r2_score(y_train, y_train_pred)
+def _cv_scores(cv_results: dict, index: int) -> dict:
+    """mean held-out score of candidate index for every metric that was collected"""
+    return {
+        metric: float(cv_results[f"mean_test_{metric}"][index])
+        for metric in MODEL_SELECTION_SCORING
+        if f"mean_test_{metric}" in cv_results
+    }
 
-            test_model_score = r2_score(y_test, y_test_pred)
+def _staged_size_param(model, para):
+    """
+    Name of the ensemble size parameter when the model can score its smaller
+    sizes for free (n_estimators, or max_iter of HistGradientBoosting), else None.
+    """
+    if not isinstance(para, dict):
+        return None
+    if para.get("n_estimators") and (hasattr(model, "staged_predict") or "warm_start" in model.get_params()):
+        return "n_estimators"
+    if para.get("max_iter") and hasattr(model, "staged_predict"):
+        return "max_iter"
+    return None
+
+def _staged_fold_scores(model, params, size_param, sizes, X, y, train, test):
+    """
+    Fit one ensemble of max(sizes) members on a fold and score every size.
+    Boosting: one fit, staged_predict yields the prediction after each stage;
+    when early stopping ended the fit sooner, larger sizes get the final model.
+    Forests: warm_start adds trees to the same forest, size by size.
+    Returns an array (sizes, metrics) in MODEL_SELECTION_SCORING order.
+    """
+    estimator = clone(model).set_params(**params)
+    X_fit, y_fit, X_eval, y_eval = X[train], y[train], X[test], y[test]
+    predictions = {}
+    if hasattr(estimator, "staged_predict"):
+        estimator.set_params(**{size_param: max(sizes)}).fit(X_fit, y_fit)
+        wanted = set(sizes)
+        for stage, y_pred in enumerate(estimator.staged_predict(X_eval), start=1):
+            if stage in wanted:
+                predictions[stage] = y_pred
+        for size in sizes:
+            if size not in predictions:
+                predictions[size] = y_pred
+    else:
+        estimator.set_params(warm_start=True)
+        for size in sorted(sizes):
+            estimator.set_params(**{size_param: size}).fit(X_fit, y_fit)
+            predictions[size] = estimator.predict(X_eval)
+
+    scorers = {"f1": f1_score, "precision": precision_score, "recall": recall_score}
+    return np.array([
+        [scorers[metric](y_eval, predictions[size], zero_division=0) for metric in MODEL_SELECTION_SCORING]
+        for size in sizes
+    ])
+
+def staged_search(name, model, para, X_train, y_train, n_jobs=-1, cv=3):
+    """
+    Search over the ensemble size by growing every ensemble once per fold instead
+    of fitting each size from scratch; the other parameters are searched as a grid.
+    Returns (best params, held-out cv scores of the best candidate).
+    """
+    size_param = _staged_size_param(model, para)
+    sizes = sorted(set(para[size_param]))
+    others = list(ParameterGrid({k: v for k, v in para.items() if k != size_param}))
+    folds = list(check_cv(cv, y_train, classifier=True).split(X_train, y_train))
+
+    fold_scores = Parallel(n_jobs=n_jobs)(
+        delayed(_staged_fold_scores)(model, params, size_param, sizes, X_train, y_train, train, test)
+        for params in others
+        for train, test in folds
+    )
+    # (other params, folds, sizes, metrics) -> mean over folds
+    mean_scores = np.asarray(fold_scores).reshape(len(others), len(folds), len(sizes), -1).mean(axis=1)
+
+    f1 = mean_scores[..., 0]
+    best_other, best_size = np.unravel_index(int(np.argmax(f1)), f1.shape)
+    best_params = {**others[best_other], size_param: sizes[best_size]}
+    cv_scores = {
+        metric: float(mean_scores[best_other, best_size, i])
+        for i, metric in enumerate(MODEL_SELECTION_SCORING)
+    }
+    logging.info(
+        f"{name}: staged search scored {f1.size} candidates with "
+        f"{len(others) * len(folds)} ensemble fits, best {best_params}"
+    )
+    return best_params, cv_scores
+
+def search_model(name, model, para, X_train, y_train, n_jobs=-1, search="grid", time_budget=None, cv=3,
+                 early_stopping_rounds=None, validation_fraction=0.1):
+    """
+    Hyperparameter search for one model family.
+    Returns (name, fitted best model, seconds, held-out cv scores of the best model).
+    Candidates are ranked by cross-validated f1; the scores come from the
+    folds the search already fitted, no model is refitted to measure them.
+    X_train / y_train may be .npy file paths, which are memory-mapped read-only.
+    search="grid"    : GridSearchCV over every candidate, best model from its refit
+    search="halving" : successive halving, weak candidates only see part of the data
+    search="staged"  : ensembles grown once per fold, every n_estimators / max_iter value of the
+                       grid is scored on the way (see staged_search); other families
+                       fall back to "grid"
+    time_budget      : grid candidates in random order, batch by batch, as long as the
+                       next batch and the refit of the best one are expected to
+                       end within the budget (seconds)
+    early_stopping_rounds : boosting stops adding stages once the score on a
+                       validation_fraction hold-out of the training data has not
+                       improved for this many stages (AdaBoost through
+                       EarlyStoppingAdaBoostClassifier)
+    Errors are raised as they are: this runs in worker processes, and
+    evaluate_models wraps them with the name of the family.
+    """
+    started = time.perf_counter()
+    if isinstance(X_train, str):
+        X_train = load_numpy_array_data(X_train, mmap_mode="r")
+    if isinstance(y_train, str):
+        y_train = load_numpy_array_data(y_train, mmap_mode="r")
+
+    if early_stopping_rounds and "n_iter_no_change" in model.get_params():
+        early_stopping = {"n_iter_no_change": early_stopping_rounds, "validation_fraction": validation_fraction}
+        if "early_stopping" in model.get_params():
+            # HistGradientBoosting only stops early on large data by default
+            early_stopping["early_stopping"] = True
+        model = clone(model).set_params(**early_stopping)
+    elif early_stopping_rounds and type(model) is AdaBoostClassifier:
+        model = EarlyStoppingAdaBoostClassifier(
+            **model.get_params(deep=False),
+            n_iter_no_change=early_stopping_rounds, validation_fraction=validation_fraction,
+        )
+
+    if search == "staged" and _staged_size_param(model, para):
+        best_params, cv_scores = staged_search(name, model, para, X_train, y_train, n_jobs=n_jobs, cv=cv)
+        best_model = clone(model).set_params(**best_params).fit(X_train, y_train)
+
+    elif search == "halving":
+        from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+        from sklearn.model_selection import HalvingGridSearchCV
+
+        # successive halving only supports a single metric
+        gs = HalvingGridSearchCV(model, para, cv=cv, factor=3, n_jobs=n_jobs, scoring="f1")
+        gs.fit(X_train, y_train)
+        best_model = gs.best_estimator_
+        cv_scores = {"f1": float(gs.best_score_)}
+
+    elif time_budget:
+        candidates = list(ParameterGrid(para))
+        np.random.default_rng(42).shuffle(candidates)
+        max_batch_size = os.cpu_count() if n_jobs in (None, -1) else max(1, n_jobs)
+
+        best_score, best_params, cv_scores = -np.inf, candidates[0], {}
+        # the first candidate alone measures the cost of one, every later
+        # batch is sized to what still fits in the remaining time
+        start, batch_size = 0, 1
+        while start < len(candidates):
+            batch_started = time.perf_counter()
+            batch = [{k: [v] for k, v in c.items()} for c in candidates[start:start + batch_size]]
+            gs = GridSearchCV(model, batch, cv=cv, n_jobs=n_jobs, refit=False,
+                              scoring=MODEL_SELECTION_SCORING)
+            gs.fit(X_train, y_train)
+            index = int(np.argmax(gs.cv_results_["mean_test_f1"]))
+            if gs.cv_results_["mean_test_f1"][index] > best_score:
+                best_score = gs.cv_results_["mean_test_f1"][index]
+                best_params = gs.cv_results_["params"][index]
+                cv_scores = _cv_scores(gs.cv_results_, index)
+            start += len(batch)
+
+            seconds_per_candidate = max(time.perf_counter() - batch_started, 1e-6) / len(batch)
+            # keep about one candidate's time for the final refit
+            remaining = time_budget - (time.perf_counter() - started) - seconds_per_candidate
+            batch_size = min(max_batch_size, int(remaining // seconds_per_candidate))
+            if start < len(candidates) and batch_size < 1:
+                logging.info(f"{name}: time budget reached after {start}/{len(candidates)} candidates")
+                break
+
+        best_model = clone(model).set_params(**best_params).fit(X_train, y_train)
+
+    else:
+        gs = GridSearchCV(model, para, cv=cv, n_jobs=n_jobs,
+                          scoring=MODEL_SELECTION_SCORING, refit="f1")
+        gs.fit(X_train, y_train)
+        best_model = gs.best_estimator_
+        cv_scores = _cv_scores(gs.cv_results_, gs.best_index_)
+
+    elapsed = time.perf_counter() - started
+    logging.info(f"{name}: search finished in {elapsed:.1f}s, cv scores {cv_scores}")
+    return name, best_model, elapsed, cv_scores
+
+def _array_reference(array):
+    """file name of a whole read-only memory-mapped .npy array, else the array itself"""
+    if isinstance(array, np.memmap) and array.mode == "r" and array.filename:
+        try:
+            mapped = load_numpy_array_data(array.filename, mmap_mode="r")
+            # a view with the shape and strides of the whole file is the whole file
+            if (mapped.shape, mapped.strides, mapped.dtype) == (array.shape, array.strides, array.dtype):
+                return array.filename
+        except Exception:
+            pass
+    return array
+
+def evaluate_models(X_train, y_train,models,param,n_jobs=-1,search="grid",time_budget=None,
+                    early_stopping_rounds=None,validation_fraction=0.1):
+    """
+    Search every model family and report the held-out (cross-validated)
+    scores of its best model: {name: {"f1": ..., "precision": ..., "recall": ...}}.
+    The test set is not used, so it stays untouched until the winner is chosen.
+    Families are searched at the same time in separate processes, each
+    spreading its candidates over its share of the cores. models is updated
+    in place with the fitted best estimator of each family.
+    """
+    try:
+        report = {}
 
-            report[list(models.keys())[i]] = test_model_score
+        n_cores = os.cpu_count() if n_jobs in (None, -1) else n_jobs
+        # slight oversubscription so cores freed by fast families are reused
+        family_jobs = max(1, math.ceil(2 * n_cores / len(models)))
+        # memory-mapped arrays are sent by file name, every process maps the same pages
+        X_train_ref = _array_reference(X_train)
+        y_train_ref = _array_reference(y_train)
+
+        # loky workers, unlike forked multiprocessing ones, can run the nested
+        # joblib pools of the searches and still shut down cleanly
+        executor = get_reusable_executor(max_workers=min(len(models), n_cores))
+        futures = [
+            executor.submit(
+                search_model, name, model, param[name], X_train_ref, y_train_ref,
+                n_jobs=family_jobs, search=search, time_budget=time_budget,
+                early_stopping_rounds=early_stopping_rounds, validation_fraction=validation_fraction,
+            )
+            for name, model in models.items()
+        ]
+        results = []
+        for name, future in zip(models, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # NetworkSecurityException does not survive the trip back from a
+                # worker, so search_model raises the original error and it is wrapped here
+                raise NetworkSecurityException(Exception(f"search of {name} failed: {e!r}"), sys)
+
+        for name, best_model, elapsed, cv_scores in results:
+            models[name] = best_model
+            report[name] = cv_scores
 
         return report
 
     except Exception as e:
-        raise NetworkSecurityException(e, sys)
\ No newline at end of file
+        raise NetworkSecurityException(e, sys)
@@ -0,0 +1,157 @@
+import sys
+import time
+import threading
+
+import numpy as np
+import pandas as pd
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+from networksecurity.constant.training_pipeline import (
+    DRIFT_MONITOR_BUCKET_SECONDS,
+    DRIFT_MONITOR_N_BUCKETS,
+    DRIFT_MONITOR_PSI_THRESHOLD,
+    DRIFT_MONITOR_MIN_OBSERVATIONS,
+)
+from networksecurity.utils.ml_utils.feature_extractor import PLACEHOLDER_FEATURES
+from networksecurity.utils.ml_utils.metric.drift_metric import (
+    distinct_values,
+    value_histograms,
+    chi2_from_histograms,
+    psi_from_histograms,
+)
+
+"""
+this file watches the feature vectors the web app scores for drift
+the training pipeline saves a baseline (per-feature value counts of the
+training features) next to the model; the service adds every scored
+feature matrix to a ring of time buckets, so memory per feature is fixed
+(n_buckets x values) and old traffic falls out of the window
+report() compares the window with the baseline (PSI and chi-square) and
+flags features whose distribution moved, e.g. age_of_domain stuck at its
+fallback value while WHOIS lookups fail
+placeholder features are served as a constant but vary in the training
+data, so they would always look drifted; they are reported on their own
+and never flagged
+"""
+
+
+def build_feature_baseline(dataframe: pd.DataFrame) -> dict:
+    """
+    Value counts of every column of dataframe, saved with the model.
+    """
+    try:
+        data = dataframe.to_numpy(dtype=np.float64)
+        values = distinct_values(data)
+        return {
+            "columns": list(dataframe.columns),
+            "values": values,
+            "counts": value_histograms(data, values),
+        }
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+class FeatureDriftMonitor:
+    def __init__(self, baseline: dict = None,
+                 bucket_seconds: float = DRIFT_MONITOR_BUCKET_SECONDS,
+                 n_buckets: int = DRIFT_MONITOR_N_BUCKETS,
+                 psi_threshold: float = DRIFT_MONITOR_PSI_THRESHOLD,
+                 min_observations: int = DRIFT_MONITOR_MIN_OBSERVATIONS,
+                 placeholder_columns: list = PLACEHOLDER_FEATURES):
+        try:
+            self.placeholder_columns = set(placeholder_columns)
+            self.bucket_seconds = bucket_seconds
+            self.n_buckets = n_buckets
+            self.psi_threshold = psi_threshold
+            self.min_observations = min_observations
+            self._lock = threading.Lock()
+            self.set_baseline(baseline)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def set_baseline(self, baseline: dict) -> None:
+        """
+        Compare against baseline from now on; the current window is dropped.
+        """
+        with self._lock:
+            self.baseline = baseline
+            if baseline is None:
+                self._counts = None
+                return
+            n_columns, n_values = baseline["counts"].shape
+            self._counts = np.zeros((self.n_buckets, n_columns, n_values), dtype=np.int64)
+            self._bucket_ids = np.full(self.n_buckets, -1, dtype=np.int64)
+            self._unseen = np.zeros((self.n_buckets, n_columns), dtype=np.int64)
+
+    def _current_bucket_id(self) -> int:
+        return int(time.time() // self.bucket_seconds)
+
+    def observe(self, features: pd.DataFrame) -> None:
+        """
+        Add the rows of a scored feature matrix to the current time bucket.
+        """
+        baseline = self.baseline
+        if baseline is None or len(features) == 0:
+            return
+        try:
+            data = features[baseline["columns"]].to_numpy(dtype=np.float64)
+            counts = value_histograms(data, baseline["values"])
+            unseen = len(data) - counts.sum(axis=1)
+
+            bucket_id = self._current_bucket_id()
+            slot = bucket_id % self.n_buckets
+            with self._lock:
+                if baseline is not self.baseline:
+                    return
+                if self._bucket_ids[slot] != bucket_id:
+                    self._counts[slot] = 0
+                    self._unseen[slot] = 0
+                    self._bucket_ids[slot] = bucket_id
+                self._counts[slot] += counts
+                self._unseen[slot] += unseen
+        except Exception as e:
+            logging.info(f"Feature drift monitor could not observe a batch: {e}")
+
+    def report(self) -> dict:
+        """
+        Per-feature PSI and chi-square p-value of the window against the baseline.
+        Features are only flagged once the window holds min_observations rows;
+        placeholder columns go to "placeholder_features" and are never flagged.
+        """
+        try:
+            with self._lock:
+                baseline = self.baseline
+                if baseline is None:
+                    return {"baseline": False}
+                live = self._bucket_ids > self._current_bucket_id() - self.n_buckets
+                window = self._counts[live].sum(axis=0)
+                unseen = self._unseen[live].sum(axis=0)
+
+            observations = int(window[0].sum() + unseen[0]) if len(window) else 0
+            psi = psi_from_histograms(baseline["counts"], window)
+            _, p_value = chi2_from_histograms(baseline["counts"], window)
+            enough = observations >= self.min_observations
+
+            features, placeholder_features = {}, {}
+            for i, column in enumerate(baseline["columns"]):
+                stats = {
+                    "psi": round(float(psi[i]), 6),
+                    "p_value": float(p_value[i]),
+                    "unseen_values": int(unseen[i]),
+                }
+                if column in self.placeholder_columns:
+                    placeholder_features[column] = stats
+                else:
+                    stats["drift_status"] = bool(enough and psi[i] > self.psi_threshold)
+                    features[column] = stats
+            return {
+                "baseline": True,
+                "observations": observations,
+                "window_seconds": self.bucket_seconds * self.n_buckets,
+                "drifted_features": [c for c, f in features.items() if f["drift_status"]],
+                "features": features,
+                "placeholder_features": placeholder_features,
+            }
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
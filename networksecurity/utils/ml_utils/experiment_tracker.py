@@ -0,0 +1,154 @@
+import os
+import sys
+import queue
+import atexit
+import socket
+import threading
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+from networksecurity.constant.training_pipeline import (
+    MLFLOW_DAGSHUB_REPO_OWNER,
+    MLFLOW_DAGSHUB_REPO_NAME,
+    MLFLOW_REMOTE_HOST,
+    MLFLOW_REMOTE_TIMEOUT,
+    MLFLOW_LOCAL_TRACKING_URI,
+    MLFLOW_FLUSH_TIMEOUT,
+)
+
+"""
+this file logs training runs to MLflow from a background thread
+training only puts a run (metrics and artifact files) on a queue and
+carries on; a single worker thread picks the tracking backend the first
+time it is needed: DagsHub when its host is reachable, otherwise the local
+mlflow.db, and a run the remote rejects is written locally instead
+mlflow and dagshub are imported by the worker, so training does not need
+them installed; queued runs are flushed (with a time limit) at exit
+an MLFLOW_TRACKING_URI set in the environment is used as it is
+"""
+
+
+def remote_reachable(host: str = MLFLOW_REMOTE_HOST, timeout: float = MLFLOW_REMOTE_TIMEOUT) -> bool:
+    """True when a TCP connection to host:443 opens within timeout seconds"""
+    try:
+        with socket.create_connection((host, 443), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+class ExperimentTracker:
+    def __init__(self, repo_owner: str = MLFLOW_DAGSHUB_REPO_OWNER,
+                 repo_name: str = MLFLOW_DAGSHUB_REPO_NAME,
+                 local_tracking_uri: str = MLFLOW_LOCAL_TRACKING_URI,
+                 flush_timeout: float = MLFLOW_FLUSH_TIMEOUT):
+        try:
+            self.repo_owner = repo_owner
+            self.repo_name = repo_name
+            self.local_tracking_uri = local_tracking_uri
+            self.flush_timeout = flush_timeout
+            self.tracking_uri = None
+            self._queue = queue.Queue()
+            self._thread = None
+            self._start_lock = threading.Lock()
+            atexit.register(self.flush)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def log_run(self, metrics: dict, artifact_file_paths: list = (), params: dict = None) -> None:
+        """
+        Queue one run; returns at once, the worker logs it in the background.
+        """
+        self._queue.put({
+            "metrics": dict(metrics),
+            "params": dict(params or {}),
+            "artifact_file_paths": list(artifact_file_paths),
+        })
+        self._start()
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait up to timeout seconds (flush_timeout by default) for queued runs.
+        Returns True when every run was handled.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return self._queue.unfinished_tasks == 0
+        timeout = self.flush_timeout if timeout is None else timeout
+        done = threading.Event()
+        threading.Thread(target=lambda: (self._queue.join(), done.set()), daemon=True).start()
+        if not done.wait(timeout):
+            logging.info(f"MLflow tracking: {self._queue.unfinished_tasks} runs still queued after {timeout}s")
+            return False
+        return True
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="mlflow-tracker", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            run = self._queue.get()
+            try:
+                self._log(run)
+            except Exception as e:
+                logging.info(f"MLflow tracking failed, run dropped: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _connect(self, mlflow) -> str:
+        """Pick the tracking backend once: environment, DagsHub or local file"""
+        if os.getenv("MLFLOW_TRACKING_URI"):
+            return os.environ["MLFLOW_TRACKING_URI"]
+        if remote_reachable():
+            try:
+                import dagshub
+
+                dagshub.init(repo_owner=self.repo_owner, repo_name=self.repo_name, mlflow=True)
+                return mlflow.get_tracking_uri()
+            except Exception as e:
+                logging.info(f"DagsHub tracking unavailable: {e}")
+        return self._use_local(mlflow)
+
+    def _use_local(self, mlflow) -> str:
+        mlflow.set_tracking_uri(self.local_tracking_uri)
+        return self.local_tracking_uri
+
+    def _log(self, run: dict):
+        import mlflow
+
+        if self.tracking_uri is None:
+            self.tracking_uri = self._connect(mlflow)
+            logging.info(f"MLflow tracking to {self.tracking_uri}")
+        try:
+            self._log_to_current(mlflow, run)
+        except Exception as e:
+            if self.tracking_uri == self.local_tracking_uri:
+                raise
+            logging.info(f"MLflow tracking to {self.tracking_uri} failed, switching to local: {e}")
+            self.tracking_uri = self._use_local(mlflow)
+            self._log_to_current(mlflow, run)
+
+    @staticmethod
+    def _log_to_current(mlflow, run: dict):
+        with mlflow.start_run():
+            if run["params"]:
+                mlflow.log_params(run["params"])
+            mlflow.log_metrics(run["metrics"])
+            # files go last, after every metric is recorded
+            for file_path in run["artifact_file_paths"]:
+                mlflow.log_artifact(file_path)
+
+
+_experiment_tracker = None
+_experiment_tracker_lock = threading.Lock()
+
+
+def get_experiment_tracker() -> ExperimentTracker:
+    """One tracker (and worker thread) per process"""
+    global _experiment_tracker
+    with _experiment_tracker_lock:
+        if _experiment_tracker is None:
+            _experiment_tracker = ExperimentTracker()
+        return _experiment_tracker
@@ -0,0 +1,166 @@
+import sys
+import time
+from dataclasses import dataclass, field
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+from networksecurity.utils.ml_utils.feature_extractor import (
+    NETWORK_FEATURE_GROUPS,
+    network_feature_fallbacks,
+    order_features,
+    url_features,
+)
+
+"""
+this file runs feature extraction for a URL under a latency budget
+the lexical features are computed inline since they never touch the network
+the html, whois and dns groups run concurrently on a thread pool: batches
+share one pool, single-URL calls (the interactive form) get a pool of their
+own so they never queue behind a large batch
+a URL whose string cannot be parsed gets an error instead of features
+a group that fails or is still running at the deadline gets the neutral
+values its except branches return (SSLfinal_State of plain http stays 1,
+as in lexical-only mode), so the output is always the 30-key dict
+"""
+
+# Overall budget for one URL, in seconds
+FEATURE_EXTRACTION_DEADLINE = 4.0
+# Budget for a whole batch, in seconds; groups still queued or running then
+# take their fallbacks, so a request stays well inside the gunicorn timeout
+FEATURE_EXTRACTION_BATCH_DEADLINE = 20.0
+FEATURE_EXTRACTION_MAX_WORKERS = 32
+# one thread per network group, for four single-URL requests at a time
+FEATURE_EXTRACTION_INTERACTIVE_MAX_WORKERS = 12
+
+
+@dataclass
+class FeatureExtractionResult:
+    features: dict
+    timings: dict = field(default_factory=dict)
+    timed_out: list = field(default_factory=list)
+    error: str = None
+
+
+class _UrlJob:
+    """Futures of one URL and the time its first group started running"""
+    def __init__(self, url):
+        self.url = url
+        self.started = None
+        self.futures = {}
+
+
+def _timed(job, group):
+    started = time.perf_counter()
+    if job.started is None:
+        job.started = started
+    values = group(job.url)
+    return values, time.perf_counter() - started
+
+
+class FeatureExtractionEngine:
+    def __init__(self, deadline: float = FEATURE_EXTRACTION_DEADLINE,
+                 max_workers: int = FEATURE_EXTRACTION_MAX_WORKERS,
+                 batch_deadline: float = FEATURE_EXTRACTION_BATCH_DEADLINE,
+                 interactive_max_workers: int = FEATURE_EXTRACTION_INTERACTIVE_MAX_WORKERS):
+        try:
+            self.deadline = deadline
+            self.batch_deadline = batch_deadline
+            self.executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="feature-extractor"
+            )
+            self.interactive_executor = ThreadPoolExecutor(
+                max_workers=interactive_max_workers, thread_name_prefix="feature-extractor-interactive"
+            )
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def extract(self, url: str) -> FeatureExtractionResult:
+        """
+        Extract all features of url within the deadline, on the interactive pool.
+        """
+        return self.extract_many([url])[0]
+
+    def extract_many(self, urls: list) -> list:
+        """
+        Extract features of many URLs concurrently, one result per URL in order.
+        Each URL gets the full deadline, counted from the moment its first
+        network group starts running, so a long queue does not eat the budget.
+        The whole call ends within batch_deadline: whatever is still queued or
+        running by then gets its fallback values.
+        A single URL runs on the interactive pool and ends within deadline.
+        """
+        try:
+            interactive = len(urls) == 1
+            executor = self.interactive_executor if interactive else self.executor
+            batch_ends = time.perf_counter() + (self.deadline if interactive else self.batch_deadline)
+            jobs = []
+            for url in urls:
+                job = _UrlJob(url)
+                job.futures = {
+                    name: executor.submit(_timed, job, group)
+                    for name, group in NETWORK_FEATURE_GROUPS.items()
+                }
+                jobs.append(job)
+
+            return [self._collect(job, batch_ends) for job in jobs]
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def _collect(self, job: _UrlJob, batch_ends: float) -> FeatureExtractionResult:
+        started = time.perf_counter()
+        try:
+            values = url_features(job.url)
+        except Exception as e:
+            # e.g. a malformed port or IPv6 host; only this URL fails
+            logging.info(f"Cannot extract features of {job.url}: {e}")
+            for future in job.futures.values():
+                future.cancel()
+            return FeatureExtractionResult(features={}, error=str(e))
+        timings = {"url": time.perf_counter() - started}
+
+        while True:
+            pending = [f for f in job.futures.values() if not f.done()]
+            if not pending:
+                break
+            now = time.perf_counter()
+            if now >= batch_ends:
+                break
+            if job.started is None:
+                # still queued behind other URLs, the clock has not started
+                wait(pending, timeout=min(0.05, batch_ends - now), return_when=FIRST_COMPLETED)
+                continue
+            remaining = min(job.started + self.deadline, batch_ends) - now
+            if remaining <= 0:
+                break
+            wait(pending, timeout=remaining)
+
+        timed_out = []
+        for name, future in job.futures.items():
+            if future.done() and not future.cancelled() and future.exception() is None:
+                group_values, timings[name] = future.result()
+            else:
+                if not future.done() or future.cancelled():
+                    timed_out.append(name)
+                    future.cancel()
+                else:
+                    logging.info(f"Feature group {name} failed for {job.url}: {future.exception()}")
+                group_values = network_feature_fallbacks(name, job.url)
+                timings[name] = time.perf_counter() - (job.started or started)
+            values.update(group_values)
+
+        timings["total"] = time.perf_counter() - min(started, job.started or started)
+        if timed_out:
+            logging.info(f"Feature groups {timed_out} missed the {self.deadline}s deadline for {job.url}")
+        logging.info(f"Feature extraction timings for {job.url}: {timings}")
+
+        return FeatureExtractionResult(
+            features=order_features(values),
+            timings=timings,
+            timed_out=timed_out,
+        )
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.interactive_executor.shutdown(wait=False, cancel_futures=True)
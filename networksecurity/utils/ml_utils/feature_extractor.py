@@ -2,15 +2,179 @@ import re
 import socket
 import whois
 import datetime
+import threading
+from concurrent.futures import Future
 from urllib.parse import urlparse
 import requests
 from bs4 import BeautifulSoup
+from networksecurity.utils.main_utils.cache import TTLCache
+
+# WHOIS answers shared by every request in the process.
+# Failures and empty records are kept for a shorter time.
+WHOIS_CACHE_MAX_SIZE = 4096
+WHOIS_CACHE_TTL = 24 * 60 * 60
+WHOIS_CACHE_NEGATIVE_TTL = 15 * 60
+WHOIS_CACHE = TTLCache(maxsize=WHOIS_CACHE_MAX_SIZE, ttl=WHOIS_CACHE_TTL)
+# Lookups still running, one per domain; other callers wait for its answer
+_WHOIS_IN_FLIGHT = {}
+_WHOIS_IN_FLIGHT_LOCK = threading.Lock()
+_whois_shared_lookups = 0
+
+# ------------------- Page context -------------------
+class PageContext:
+    """
+    Fetches a URL once and shares the response, its lowercased text and the
+    parsed BeautifulSoup tree with every HTML feature.
+    Nothing is fetched or parsed until a feature asks for it. A failed fetch
+    or parse is remembered and raised again on every access, so each feature
+    still falls back to the value of its own except branch.
+    """
+    def __init__(self, url, timeout=3):
+        self.url = url
+        self.timeout = timeout
+        self.netloc = urlparse(url).netloc
+        self._response = None
+        self._text = None
+        self._soup = None
+        self._fetch_error = None
+        self._parse_error = None
+
+    @property
+    def response(self):
+        if self._response is None and self._fetch_error is None:
+            try:
+                self._response = requests.get(self.url, timeout=self.timeout)
+            except Exception as e:
+                self._fetch_error = e
+        if self._fetch_error is not None:
+            raise self._fetch_error
+        return self._response
+
+    @property
+    def text(self):
+        """Lowercased response body"""
+        if self._text is None:
+            self._text = self.response.text.lower()
+        return self._text
+
+    @property
+    def soup(self):
+        if self._soup is None and self._parse_error is None:
+            content = self.response.content
+            try:
+                self._soup = BeautifulSoup(content, 'html.parser')
+            except Exception as e:
+                self._parse_error = e
+        if self._parse_error is not None:
+            raise self._parse_error
+        return self._soup
+
+
+# ------------------- WHOIS context -------------------
+def registered_domain(url):
+    """
+    Registered domain of the URL's host (a.example.co.uk -> example.co.uk),
+    from the public suffix list bundled with python-whois; IP hosts are
+    returned as they are
+    """
+    host = (urlparse(url).hostname or "").lower()
+    if not host or whois.IPV4_OR_V6.match(host):
+        return host
+    try:
+        domain = whois.extract_domain(host)
+    except Exception:
+        domain = host
+    # suffixes missing from the list come back as the bare last label
+    if "." not in domain and "." in host:
+        domain = ".".join(host.split(".")[-2:])
+    return domain
+
+def _query_whois(domain):
+    try:
+        domain_info = whois.whois(domain)
+        error = None
+    except Exception as e:
+        domain_info = None
+        error = e
+
+    negative = error is not None or not domain_info or (
+        not domain_info.domain_name and not domain_info.creation_date
+    )
+    cached = (domain_info, error)
+    WHOIS_CACHE.set(domain, cached, ttl=WHOIS_CACHE_NEGATIVE_TTL if negative else None)
+    return cached
+
+def lookup_whois(domain):
+    """
+    WHOIS record for domain, served from WHOIS_CACHE when possible.
+    Concurrent callers for one domain share a single lookup.
+    """
+    global _whois_shared_lookups
+    with _WHOIS_IN_FLIGHT_LOCK:
+        cached = WHOIS_CACHE.get(domain)
+        future = None
+        if cached is None:
+            future = _WHOIS_IN_FLIGHT.get(domain)
+            leader = future is None
+            if leader:
+                future = _WHOIS_IN_FLIGHT[domain] = Future()
+            else:
+                _whois_shared_lookups += 1
+
+    if future is not None:
+        if leader:
+            try:
+                future.set_result(_query_whois(domain))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                # the answer is cached by now, later callers find it there
+                with _WHOIS_IN_FLIGHT_LOCK:
+                    del _WHOIS_IN_FLIGHT[domain]
+        cached = future.result()
+
+    domain_info, error = cached
+    if error is not None:
+        raise error
+    return domain_info
+
+def whois_cache_stats():
+    stats = WHOIS_CACHE.stats()
+    stats["shared_lookups"] = _whois_shared_lookups
+    return stats
+
+class WhoisContext:
+    """
+    Looks up the WHOIS record of a URL's domain once and shares it with
+    every domain-age feature. A failed lookup is raised again on every
+    access, like PageContext does for fetch errors.
+    """
+    def __init__(self, url):
+        self.url = url
+        self.domain = registered_domain(url)
+        self._info = None
+        self._error = None
+
+    @property
+    def info(self):
+        if self._info is None and self._error is None:
+            try:
+                self._info = lookup_whois(self.domain)
+            except Exception as e:
+                self._error = e
+        if self._error is not None:
+            raise self._error
+        return self._info
 
 # ------------------- Basic URL Features -------------------
+# Compiled once, shared with the vectorized extractor in lexical_features.py
+IP_ADDRESS_PATTERN = re.compile(r'[0-9]{1,3}(?:\.[0-9]{1,3}){3}')
+SHORTENING_SERVICE_PATTERN = re.compile(r"(?:bit\.ly|goo\.gl|tinyurl\.com|ow\.ly|t\.co|tinyurl)")
+
 def having_ip_address(url):
     """1 if URL contains IP address, else -1"""
     try:
-        return 1 if re.search(r'[0-9]{1,3}(\.[0-9]{1,3}){3}', url) else -1
+        return 1 if IP_ADDRESS_PATTERN.search(url) else -1
     except:
         return 0
 
@@ -25,7 +189,7 @@ def url_length(url):
 
 def shortening_service(url):
     """1 if URL uses shortening service, else -1"""
-    if re.search(r"(bit\.ly|goo\.gl|tinyurl\.com|ow\.ly|t\.co|tinyurl)", url):
+    if SHORTENING_SERVICE_PATTERN.search(url):
         return 1
     return -1
 
@@ -56,12 +220,12 @@ def having_sub_domain(url):
     else:
         return 1
 
-def ssl_final_state(url):
+def ssl_final_state(url, page=None):
     """-1 if HTTPS with valid certificate, 1 if HTTP, 0 if HTTPS invalid"""
     try:
         if url.startswith("https://"):
-            r = requests.get(url, timeout=3)
-            if r.status_code == 200:
+            page = page if page is not None else PageContext(url)
+            if page.response.status_code == 200:
                 return -1
             else:
                 return 0
@@ -70,10 +234,11 @@ def ssl_final_state(url):
     except:
         return 0
 
-def domain_registration_length(url):
+def domain_registration_length(url, whois_ctx=None):
     """-1 if domain age >1 year, 1 if <1 year"""
     try:
-        domain_info = whois.whois(urlparse(url).netloc)
+        whois_ctx = whois_ctx if whois_ctx is not None else WhoisContext(url)
+        domain_info = whois_ctx.info
         if isinstance(domain_info.creation_date, list):
             creation_date = domain_info.creation_date[0]
         else:
@@ -83,25 +248,28 @@ def domain_registration_length(url):
     except:
         return 1
 
-def favicon(url):
+def favicon(url, page=None):
     """-1 if favicon domain matches URL, 1 if different"""
     try:
-        r = requests.get(url, timeout=3)
-        soup = BeautifulSoup(r.content, 'html.parser')
-        icon = soup.find("link", rel="shortcut icon")
-        if icon and urlparse(icon.get("href")).netloc != urlparse(url).netloc:
+        page = page if page is not None else PageContext(url)
+        icon = page.soup.find("link", rel="shortcut icon")
+        if icon and urlparse(icon.get("href")).netloc != page.netloc:
             return 1
         return -1
     except:
         return -1
 
+def parsed_port(parsed):
+    """port() of a urlparse() result; a port that is not a number is unusual"""
+    try:
+        p = parsed.port
+    except ValueError:
+        return 1
+    return -1 if p is None or p in [80, 443] else 1
+
 def port(url):
     """-1 if standard port, 1 if unusual port"""
-    domain = urlparse(url).netloc
-    if ':' in domain:
-        p = int(domain.split(':')[1])
-        return -1 if p in [80, 443] else 1
-    return -1
+    return parsed_port(urlparse(url))
 
 def https_token(url):
     """1 if 'https' in domain name, else -1"""
@@ -109,14 +277,13 @@ def https_token(url):
     return 1 if 'https' in domain else -1
 
 # ------------------- URL content / HTML features -------------------
-def request_url(url):
+def request_url(url, page=None):
     """1 if many requests go to external domain, else -1"""
     try:
-        r = requests.get(url, timeout=3)
-        soup = BeautifulSoup(r.content, 'html.parser')
-        imgs = soup.find_all('img', src=True)
+        page = page if page is not None else PageContext(url)
+        imgs = page.soup.find_all('img', src=True)
         total = len(imgs)
-        external = sum(1 for i in imgs if urlparse(i['src']).netloc != urlparse(url).netloc)
+        external = sum(1 for i in imgs if urlparse(i['src']).netloc != page.netloc)
         if total == 0:
             return -1
         ratio = external / total
@@ -129,14 +296,13 @@ def request_url(url):
     except:
         return 0
 
-def url_of_anchor(url):
+def url_of_anchor(url, page=None):
     """1 if many anchor links go to external domains, else -1"""
     try:
-        r = requests.get(url, timeout=3)
-        soup = BeautifulSoup(r.content, 'html.parser')
-        anchors = soup.find_all('a', href=True)
+        page = page if page is not None else PageContext(url)
+        anchors = page.soup.find_all('a', href=True)
         total = len(anchors)
-        external = sum(1 for a in anchors if urlparse(a['href']).netloc != urlparse(url).netloc)
+        external = sum(1 for a in anchors if urlparse(a['href']).netloc != page.netloc)
         if total == 0:
             return -1
         ratio = external / total
@@ -157,12 +323,11 @@ def sfh(url):
     """Dummy placeholder for server form handler"""
     return -1
 
-def submitting_to_email(url):
+def submitting_to_email(url, page=None):
     """1 if mailto in form, else -1"""
     try:
-        r = requests.get(url, timeout=3)
-        soup = BeautifulSoup(r.content, 'html.parser')
-        forms = soup.find_all('form', action=True)
+        page = page if page is not None else PageContext(url)
+        forms = page.soup.find_all('form', action=True)
         for form in forms:
             if "mailto:" in form['action']:
                 return 1
@@ -170,11 +335,12 @@ def submitting_to_email(url):
     except:
         return -1
 
-def abnormal_url(url):
+def abnormal_url(url, whois_ctx=None):
     """Check if domain in URL matches WHOIS"""
     try:
         domain = urlparse(url).netloc
-        domain_info = whois.whois(domain)
+        whois_ctx = whois_ctx if whois_ctx is not None else WhoisContext(url)
+        domain_info = whois_ctx.info
         if domain_info.domain_name and domain in domain_info.domain_name:
             return -1
         else:
@@ -182,53 +348,53 @@ def abnormal_url(url):
     except:
         return 1
 
-def redirect(url):
+def redirect(url, page=None):
     """1 if meta refresh or javascript redirect"""
     try:
-        r = requests.get(url, timeout=3)
-        if "refresh" in r.text.lower() or "window.location" in r.text.lower():
+        page = page if page is not None else PageContext(url)
+        if "refresh" in page.text or "window.location" in page.text:
             return 1
         return -1
     except:
         return 0
 
-def on_mouseover(url):
+def on_mouseover(url, page=None):
     """1 if onmouseover javascript exists, else -1"""
     try:
-        r = requests.get(url, timeout=3)
-        return 1 if "onmouseover" in r.text.lower() else -1
+        page = page if page is not None else PageContext(url)
+        return 1 if "onmouseover" in page.text else -1
     except:
         return -1
 
-def right_click(url):
+def right_click(url, page=None):
     """1 if right click disabled"""
     try:
-        r = requests.get(url, timeout=3)
-        return 1 if "event.button==2" in r.text.lower() else -1
+        page = page if page is not None else PageContext(url)
+        return 1 if "event.button==2" in page.text else -1
     except:
         return -1
 
-def pop_up_window(url):
+def pop_up_window(url, page=None):
     """1 if popup window detected"""
     try:
-        r = requests.get(url, timeout=3)
-        return 1 if "window.open" in r.text.lower() else -1
+        page = page if page is not None else PageContext(url)
+        return 1 if "window.open" in page.text else -1
     except:
         return -1
 
-def iframe(url):
+def iframe(url, page=None):
     """1 if iframe exists"""
     try:
-        r = requests.get(url, timeout=3)
-        soup = BeautifulSoup(r.content, 'html.parser')
-        return 1 if soup.find_all('iframe') else -1
+        page = page if page is not None else PageContext(url)
+        return 1 if page.soup.find_all('iframe') else -1
     except:
         return -1
 
-def age_of_domain(url):
+def age_of_domain(url, whois_ctx=None):
     """Domain age in days"""
     try:
-        domain_info = whois.whois(urlparse(url).netloc)
+        whois_ctx = whois_ctx if whois_ctx is not None else WhoisContext(url)
+        domain_info = whois_ctx.info
         if isinstance(domain_info.creation_date, list):
             creation_date = domain_info.creation_date[0]
         else:
@@ -269,8 +435,70 @@ def statistical_report(url):
     """Placeholder"""
     return -1
 
-# ------------------- Master function -------------------
-def extract_features(url):
+# Features the extractor does not compute yet; served as a constant -1
+PLACEHOLDER_FEATURES = [
+    'Links_in_tags', 'SFH', 'web_traffic', 'Page_Rank', 'Google_Index',
+    'Links_pointing_to_page', 'Statistical_report',
+]
+
+def url_error(url):
+    """Why url cannot be parsed (e.g. an unclosed IPv6 bracket), or None"""
+    try:
+        urlparse(url)
+        return None
+    except ValueError as e:
+        return str(e)
+
+# ------------------- Feature groups -------------------
+# Column order expected by the trained preprocessor and model
+FEATURE_COLUMNS = [
+    'having_IP_Address', 'URL_Length', 'Shortining_Service', 'having_At_Symbol',
+    'double_slash_redirecting', 'Prefix_Suffix', 'having_Sub_Domain', 'SSLfinal_State',
+    'Domain_registeration_length', 'Favicon', 'port', 'HTTPS_token', 'Request_URL',
+    'URL_of_Anchor', 'Links_in_tags', 'SFH', 'Submitting_to_email', 'Abnormal_URL',
+    'Redirect', 'on_mouseover', 'RightClick', 'popUpWidnow', 'Iframe', 'age_of_domain',
+    'DNSRecord', 'web_traffic', 'Page_Rank', 'Google_Index', 'Links_pointing_to_page',
+    'Statistical_report',
+]
+
+# Values returned by the except branches of each network-bound group,
+# used when a group fails or misses the extraction deadline
+NETWORK_FEATURE_FALLBACKS = {
+    'html': {
+        'SSLfinal_State': 0,
+        'Favicon': -1,
+        'Request_URL': 0,
+        'URL_of_Anchor': 0,
+        'Submitting_to_email': -1,
+        'Redirect': 0,
+        'on_mouseover': -1,
+        'RightClick': -1,
+        'popUpWidnow': -1,
+        'Iframe': -1,
+    },
+    'whois': {
+        'Domain_registeration_length': 1,
+        'Abnormal_URL': 1,
+        'age_of_domain': 1,
+    },
+    'dns': {
+        'DNSRecord': 1,
+    },
+}
+
+def network_feature_fallbacks(name, url):
+    """
+    Fallback values of group name for url; features the group can still
+    tell from the URL alone keep their real value (plain http never
+    fetches a page, so SSLfinal_State is 1 as in ssl_final_state)
+    """
+    values = dict(NETWORK_FEATURE_FALLBACKS[name])
+    if 'SSLfinal_State' in values and not url.startswith("https://"):
+        values['SSLfinal_State'] = 1
+    return values
+
+def url_features(url):
+    """Features computed from the URL string alone, plus placeholders"""
     return {
         'having_IP_Address': having_ip_address(url),
         'URL_Length': url_length(url),
@@ -279,27 +507,62 @@ def extract_features(url):
         'double_slash_redirecting': double_slash_redirecting(url),
         'Prefix_Suffix': prefix_suffix(url),
         'having_Sub_Domain': having_sub_domain(url),
-        'SSLfinal_State': ssl_final_state(url),
-        'Domain_registeration_length': domain_registration_length(url),
-        'Favicon': favicon(url),
         'port': port(url),
         'HTTPS_token': https_token(url),
-        'Request_URL': request_url(url),
-        'URL_of_Anchor': url_of_anchor(url),
         'Links_in_tags': links_in_tags(url),
         'SFH': sfh(url),
-        'Submitting_to_email': submitting_to_email(url),
-        'Abnormal_URL': abnormal_url(url),
-        'Redirect': redirect(url),
-        'on_mouseover': on_mouseover(url),
-        'RightClick': right_click(url),
-        'popUpWidnow': pop_up_window(url),
-        'Iframe': iframe(url),
-        'age_of_domain': age_of_domain(url),
-        'DNSRecord': dns_record(url),
         'web_traffic': web_traffic(url),
         'Page_Rank': page_rank(url),
         'Google_Index': google_index(url),
         'Links_pointing_to_page': links_pointing_to_page(url),
-        'Statistical_report': statistical_report(url)
+        'Statistical_report': statistical_report(url),
+    }
+
+def html_features(url, page=None):
+    """Features that need the page body; one fetch and one parse"""
+    page = page if page is not None else PageContext(url)
+    return {
+        'SSLfinal_State': ssl_final_state(url, page),
+        'Favicon': favicon(url, page),
+        'Request_URL': request_url(url, page),
+        'URL_of_Anchor': url_of_anchor(url, page),
+        'Submitting_to_email': submitting_to_email(url, page),
+        'Redirect': redirect(url, page),
+        'on_mouseover': on_mouseover(url, page),
+        'RightClick': right_click(url, page),
+        'popUpWidnow': pop_up_window(url, page),
+        'Iframe': iframe(url, page),
     }
+
+def whois_features(url, whois_ctx=None):
+    """Features that need the WHOIS record; one (cached) lookup"""
+    whois_ctx = whois_ctx if whois_ctx is not None else WhoisContext(url)
+    return {
+        'Domain_registeration_length': domain_registration_length(url, whois_ctx),
+        'Abnormal_URL': abnormal_url(url, whois_ctx),
+        'age_of_domain': age_of_domain(url, whois_ctx),
+    }
+
+def dns_features(url):
+    """Features that need a DNS resolution"""
+    return {
+        'DNSRecord': dns_record(url),
+    }
+
+# Network-bound groups, run concurrently by FeatureExtractionEngine
+NETWORK_FEATURE_GROUPS = {
+    'html': html_features,
+    'whois': whois_features,
+    'dns': dns_features,
+}
+
+def order_features(values):
+    """Arrange feature values in FEATURE_COLUMNS order"""
+    return {column: values[column] for column in FEATURE_COLUMNS}
+
+# ------------------- Master function -------------------
+def extract_features(url):
+    values = url_features(url)
+    for group in NETWORK_FEATURE_GROUPS.values():
+        values.update(group(url))
+    return order_features(values)
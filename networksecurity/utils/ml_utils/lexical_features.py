@@ -0,0 +1,119 @@
+import sys
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.utils.ml_utils.feature_extractor import (
+    FEATURE_COLUMNS,
+    IP_ADDRESS_PATTERN,
+    SHORTENING_SERVICE_PATTERN,
+    NETWORK_FEATURE_FALLBACKS,
+    network_feature_fallbacks,
+    parsed_port,
+    url_features,
+)
+
+"""
+this file computes the URL-string features for an array of URLs at once
+each URL is parsed a single time and every feature is a pandas string
+operation over the whole column, giving the same values as url_features()
+those operations have a fixed cost per call, so smaller batches go through
+url_features() one URL at a time instead
+lexical_only_features() fills the network-bound columns with their neutral
+fallback values so the model can score URLs without touching the network
+"""
+
+# Batches smaller than this are faster through the scalar url_features()
+LEXICAL_VECTORIZED_MIN_SIZE = 1000
+# url_features() keys, in order
+LEXICAL_COLUMNS = list(url_features(""))
+# built once, pandas rebuilds an index from a plain list on every frame
+_FEATURE_INDEX = pd.Index(FEATURE_COLUMNS)
+
+
+def _where(mask, if_true=1, if_false=-1):
+    return np.where(mask, if_true, if_false)
+
+
+def _lexical_columns(urls: list) -> dict:
+    """url_features() values of urls as one array per feature"""
+    if len(urls) < LEXICAL_VECTORIZED_MIN_SIZE:
+        rows = [url_features(str(u)) for u in urls]
+        return {
+            column: np.array([row[column] for row in rows], dtype=int)
+            for column in LEXICAL_COLUMNS
+        }
+
+    url = pd.Series(urls, dtype=object).astype(str)
+    parsed = [urlparse(u) for u in url]
+    netloc = pd.Series([p.netloc for p in parsed], dtype=object)
+    path_tail = pd.Series([p.path[1:] for p in parsed], dtype=object)
+
+    length = url.str.len()
+    dots = netloc.str.count(r"\.")
+    placeholder = np.full(len(url), -1)
+
+    return {
+        'having_IP_Address': _where(url.str.contains(IP_ADDRESS_PATTERN.pattern, regex=True)),
+        'URL_Length': np.select([length < 54, length <= 75], [-1, 0], 1),
+        'Shortining_Service': _where(url.str.contains(SHORTENING_SERVICE_PATTERN.pattern, regex=True)),
+        'having_At_Symbol': _where(url.str.contains("@", regex=False)),
+        'double_slash_redirecting': _where(path_tail.str.contains("//", regex=False)),
+        'Prefix_Suffix': _where(netloc.str.contains("-", regex=False)),
+        'having_Sub_Domain': np.select([dots <= 1, dots == 2], [-1, 0], 1),
+        'port': np.array([parsed_port(p) for p in parsed]),
+        'HTTPS_token': _where(netloc.str.contains("https", regex=False)),
+        'Links_in_tags': placeholder,
+        'SFH': placeholder,
+        'web_traffic': placeholder,
+        'Page_Rank': placeholder,
+        'Google_Index': placeholder,
+        'Links_pointing_to_page': placeholder,
+        'Statistical_report': placeholder,
+    }
+
+
+def lexical_features(urls) -> pd.DataFrame:
+    """
+    Vectorized url_features(): one row per URL, columns in url_features() order.
+    """
+    try:
+        return pd.DataFrame(_lexical_columns(list(urls)), columns=LEXICAL_COLUMNS)
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def _lexical_only_row(url: str) -> list:
+    values = url_features(url)
+    for name in NETWORK_FEATURE_FALLBACKS:
+        values.update(network_feature_fallbacks(name, url))
+    return [values[column] for column in FEATURE_COLUMNS]
+
+
+def lexical_only_features(urls) -> pd.DataFrame:
+    """
+    Full model input for urls without any network call: lexical features plus
+    the fallback value of every network-bound feature, in FEATURE_COLUMNS order.
+    """
+    try:
+        urls = [str(u) for u in urls]
+        if len(urls) < LEXICAL_VECTORIZED_MIN_SIZE:
+            data = np.array([_lexical_only_row(u) for u in urls], dtype=int)
+            return pd.DataFrame(data.reshape(len(urls), len(FEATURE_COLUMNS)), columns=_FEATURE_INDEX)
+
+        columns = _lexical_columns(urls)
+        for group_fallbacks in NETWORK_FEATURE_FALLBACKS.values():
+            for column, value in group_fallbacks.items():
+                columns[column] = np.full(len(urls), value)
+        # ssl_final_state only fetches https URLs, plain http is always 1
+        is_https = np.array([u.startswith("https://") for u in urls], dtype=bool)
+        columns['SSLfinal_State'] = _where(is_https, columns['SSLfinal_State'], 1)
+        # one 2-D block, building the frame column by column costs more than the features
+        data = np.column_stack([columns[column] for column in FEATURE_COLUMNS])
+        return pd.DataFrame(data, columns=_FEATURE_INDEX)
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
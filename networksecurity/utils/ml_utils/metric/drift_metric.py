@@ -0,0 +1,120 @@
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2, kstwo
+
+from networksecurity.exception.exception import NetworkSecurityException
+
+"""
+this file holds the drift statistics computed from value-count histograms
+the features only take a handful of values ({-1, 0, 1}), so a column is
+fully described by the counts of each value: value_histograms() counts
+every column of a 2d array in one vectorized pass and the tests below
+work on those (columns, values) count matrices instead of sorting raw data
+the KS statistic from histograms equals the one of ks_2samp on the raw
+columns; its p-value uses the asymptotic distribution
+"""
+
+# floor for empty bins in the PSI log ratio
+PSI_EPSILON = 1e-4
+
+
+def distinct_values(*arrays) -> np.ndarray:
+    """Sorted distinct non-NaN values over all arrays"""
+    values = pd.unique(np.concatenate([np.asarray(a, dtype=np.float64).ravel() for a in arrays]))
+    return np.sort(values[~np.isnan(values)])
+
+
+def value_histograms(data: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    counts[j, k] = number of rows whose column j equals values[k].
+    NaN and values not in `values` are not counted.
+    """
+    try:
+        data = np.asarray(data, dtype=np.float64)
+        if data.ndim == 1:
+            data = data[:, None]
+        n_columns, n_values = data.shape[1], len(values)
+        codes = np.minimum(np.searchsorted(values, data), max(n_values - 1, 0))
+        known = values[codes] == data if n_values else np.zeros(data.shape, dtype=bool)
+        codes = codes + np.arange(n_columns) * n_values
+        return np.bincount(codes[known], minlength=n_columns * n_values).reshape(n_columns, n_values)
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def sample_rows(data, sample_size: int, random_state: int = 42):
+    """
+    sample_size rows of data (a DataFrame or an array) drawn uniformly
+    without replacement, kept in their original order, or data itself when
+    it is small enough. Only row indices are drawn, so sampling a DataFrame
+    before converting it means only the sampled rows are ever converted.
+    """
+    if sample_size is None or len(data) <= sample_size:
+        return data
+    rng = np.random.default_rng(random_state)
+    rows = np.sort(rng.choice(len(data), size=sample_size, replace=False))
+    return data.iloc[rows] if isinstance(data, pd.DataFrame) else data[rows]
+
+
+def ks_from_histograms(base_counts: np.ndarray, current_counts: np.ndarray):
+    """Two-sample KS statistic and p-value per column, like ks_2samp"""
+    n1 = base_counts.sum(axis=1)
+    n2 = current_counts.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cdf1 = np.cumsum(base_counts, axis=1) / n1[:, None]
+        cdf2 = np.cumsum(current_counts, axis=1) / n2[:, None]
+        statistic = np.nan_to_num(np.abs(cdf1 - cdf2)).max(axis=1, initial=0.0)
+        en = np.round(n1 * n2 / (n1 + n2))
+    p_value = np.ones(len(statistic))
+    valid = (n1 > 0) & (n2 > 0)
+    p_value[valid] = np.clip(kstwo.sf(statistic[valid], en[valid]), 0.0, 1.0)
+    return statistic, p_value
+
+
+def chi2_from_histograms(base_counts: np.ndarray, current_counts: np.ndarray):
+    """Chi-square test of homogeneity per column (2 x values contingency table)"""
+    observed = np.stack([base_counts, current_counts], axis=1).astype(np.float64)
+    row_totals = observed.sum(axis=2, keepdims=True)
+    value_totals = observed.sum(axis=1, keepdims=True)
+    total = row_totals.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        expected = row_totals * value_totals / total
+        terms = np.where(expected > 0, (observed - expected) ** 2 / expected, 0.0)
+    statistic = terms.sum(axis=(1, 2))
+    dof = np.maximum((value_totals[:, 0, :] > 0).sum(axis=1) - 1, 0)
+    p_value = np.where(dof > 0, chi2.sf(statistic, np.maximum(dof, 1)), 1.0)
+    return statistic, p_value
+
+
+def psi_from_histograms(base_counts: np.ndarray, current_counts: np.ndarray) -> np.ndarray:
+    """Population stability index per column"""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p = base_counts / np.maximum(base_counts.sum(axis=1, keepdims=True), 1)
+        q = current_counts / np.maximum(current_counts.sum(axis=1, keepdims=True), 1)
+    p = np.maximum(p, PSI_EPSILON)
+    q = np.maximum(q, PSI_EPSILON)
+    return ((q - p) * np.log(q / p)).sum(axis=1)
+
+
+DRIFT_TESTS = {
+    "ks": ks_from_histograms,
+    "chi2": chi2_from_histograms,
+}
+
+
+def drift_p_values(base: np.ndarray, current: np.ndarray, method: str = "ks",
+                   sample_size: int = None) -> np.ndarray:
+    """
+    p-value of the `method` test for every column of two 2d arrays (or
+    DataFrames), each sampled down to sample_size rows first when given.
+    """
+    try:
+        base = np.asarray(sample_rows(base, sample_size), dtype=np.float64)
+        current = np.asarray(sample_rows(current, sample_size), dtype=np.float64)
+        values = distinct_values(base, current)
+        _, p_value = DRIFT_TESTS[method](value_histograms(base, values), value_histograms(current, values))
+        return p_value
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
@@ -0,0 +1,63 @@
+import numpy as np
+from sklearn.ensemble import AdaBoostClassifier
+from sklearn.model_selection import train_test_split
+
+"""
+this file adds validation-based early stopping to AdaBoost, which, unlike
+the gradient boosting models, has no n_iter_no_change of its own
+a validation_fraction hold-out is split off, the ensemble is boosted on the
+rest and scored stage by stage on the hold-out (staged_score); the stages
+after the best one are dropped once n_iter_no_change stages in a row did not
+improve on it
+AdaBoost has no warm start, so every stage is still fitted: this picks the
+ensemble size on held-out data, it does not shorten the fit
+"""
+
+
+class EarlyStoppingAdaBoostClassifier(AdaBoostClassifier):
+    _parameter_constraints = {
+        **AdaBoostClassifier._parameter_constraints,
+        "n_iter_no_change": "no_validation",
+        "validation_fraction": "no_validation",
+    }
+
+    def __init__(self, estimator=None, *, n_estimators=50, learning_rate=1.0, random_state=None,
+                 n_iter_no_change=None, validation_fraction=0.1):
+        super().__init__(
+            estimator=estimator,
+            n_estimators=n_estimators,
+            learning_rate=learning_rate,
+            random_state=random_state,
+        )
+        self.n_iter_no_change = n_iter_no_change
+        self.validation_fraction = validation_fraction
+
+    def fit(self, X, y, sample_weight=None):
+        if not self.n_iter_no_change:
+            return super().fit(X, y, sample_weight=sample_weight)
+
+        if sample_weight is None:
+            X_fit, X_val, y_fit, y_val = train_test_split(
+                X, y, test_size=self.validation_fraction, stratify=y, random_state=self.random_state,
+            )
+            super().fit(X_fit, y_fit)
+        else:
+            X_fit, X_val, y_fit, y_val, w_fit, _ = train_test_split(
+                X, y, sample_weight, test_size=self.validation_fraction, stratify=y,
+                random_state=self.random_state,
+            )
+            super().fit(X_fit, y_fit, sample_weight=w_fit)
+
+        best_score, best_stage = -np.inf, 0
+        for stage, score in enumerate(self.staged_score(X_val, y_val), start=1):
+            if score > best_score:
+                best_score, best_stage = score, stage
+            elif stage - best_stage >= self.n_iter_no_change:
+                break
+
+        # the first stages of a longer fit are exactly the fit of a shorter one
+        self.estimators_ = self.estimators_[:best_stage]
+        self.estimator_weights_ = self.estimator_weights_[:best_stage]
+        self.estimator_errors_ = self.estimator_errors_[:best_stage]
+        self.n_estimators_ = best_stage
+        return self
@@ -3,6 +3,16 @@ from networksecurity.constant.training_pipeline import SAVED_MODEL_DIR,MODEL_FIL
 import os
 import sys
 
+import numpy as np
+from sklearn.dummy import DummyClassifier
+from sklearn.ensemble import (
+    AdaBoostClassifier,
+    GradientBoostingClassifier,
+    HistGradientBoostingClassifier,
+    RandomForestClassifier,
+)
+from sklearn.tree import DecisionTreeClassifier
+
 from networksecurity.exception.exception import NetworkSecurityException
 from networksecurity.logging.logger import logging
 """
@@ -23,18 +33,273 @@ Then passes transformed data into the ML model.
 
 Used for deployment
 FastAPI / Flask will load this object and call .predict() directly.
+
+Tree ensembles (Random Forest, Decision Tree, Gradient Boosting, AdaBoost,
+Hist Gradient Boosting) can be compiled with NetworkModel.compile() into flat NumPy node arrays.
+CompiledTreeEnsemble walks every tree for every row at once and adds the
+leaf values in the same order as scikit-learn, so predictions are identical
+while the per-call validation and per-estimator dispatch are skipped.
+Every feature of this dataset is -1, 0 or 1, so each node also stores the
+child each of the three values goes to: a step is then a few flat lookups,
+and a (row, tree) path is dropped as soon as it reaches its leaf instead of
+stepping max_depth times. Other values take the generic threshold walk.
 """
+
+# Rows used to check a compiled model against scikit-learn
+COMPILE_CHECK_ROWS = 2048
+# The values every feature takes, walked through per-node lookup tables
+TERNARY_VALUES = np.array([-1, 0, 1], dtype=np.float32)
+
+
+class HistTreeNodes:
+    """
+    The nodes of one HistGradientBoosting predictor with the attributes of
+    a scikit-learn tree_ that CompiledTreeEnsemble reads.
+    """
+    def __init__(self, nodes):
+        self.node_count = len(nodes)
+        is_leaf = nodes["is_leaf"].astype(bool)
+        self.children_left = np.where(is_leaf, -1, nodes["left"].astype(np.intp))
+        self.children_right = np.where(is_leaf, -1, nodes["right"].astype(np.intp))
+        self.feature = nodes["feature_idx"].astype(np.intp)
+        # rows with x <= num_threshold go left, as in scikit-learn trees
+        self.threshold = nodes["num_threshold"].astype(np.float64)
+        self.max_depth = int(nodes["depth"].max())
+
+
+class CompiledTreeEnsemble:
+    """
+    All trees of an ensemble in one set of node arrays.
+    Leaves point to themselves, so every row can take exactly max_depth steps.
+    """
+    def __init__(self, kind, trees, leaf_values, classes, n_features, **params):
+        self.kind = kind
+        self.classes_ = classes
+        self.n_features = n_features
+        self.params = params
+
+        sizes = [tree.node_count for tree in trees]
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.intp)
+        self.roots = offsets
+
+        left, right, feature, threshold = [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            node_ids = np.arange(tree.node_count, dtype=np.intp) + offset
+            is_leaf = tree.children_left == -1
+            left.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            right.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            feature.append(np.where(is_leaf, 0, tree.feature).astype(np.intp))
+            threshold.append(np.where(is_leaf, 0.0, tree.threshold))
+
+        self.left = np.concatenate(left)
+        self.right = np.concatenate(right)
+        self.feature = np.concatenate(feature)
+        self.threshold = np.concatenate(threshold)
+        self.leaf_values = np.concatenate(leaf_values)
+        self.max_depth = max(tree.max_depth for tree in trees)
+
+        node_ids = np.arange(len(self.left), dtype=np.intp)
+        self.is_leaf = self.left == node_ids
+        # ternary_children[node * 3 + value + 1]: child a feature value of -1, 0 or 1
+        # goes to (the node itself for leaves), compared as apply() does
+        goes_left = TERNARY_VALUES[np.newaxis, :] <= self.threshold[:, np.newaxis]
+        self.ternary_children = np.where(
+            goes_left, self.left[:, np.newaxis], self.right[:, np.newaxis]
+        ).astype(np.intp).ravel()
+
+    def apply(self, X) -> np.ndarray:
+        """
+        Leaf index of every tree for every row, shape (n_samples, n_trees).
+        """
+        # trees compare float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        # ensembles pickled before the ternary tables existed have none
+        # x * x == |x| holds for -1, 0 and 1 only (not for NaN)
+        if getattr(self, "ternary_children", None) is not None and (X * X == np.abs(X)).all():
+            return self._apply_ternary(X)
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots)))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def _apply_ternary(self, X) -> np.ndarray:
+        """apply() for X with values in {-1, 0, 1} only"""
+        n_rows, n_trees = X.shape[0], len(self.roots)
+        codes = (X + 1).astype(np.intp).ravel()
+        nodes = np.tile(self.roots, n_rows)
+        feature_offsets = np.repeat(np.arange(n_rows, dtype=np.intp) * X.shape[1], n_trees)
+
+        # only the paths that have not reached their leaf take another step
+        active = np.flatnonzero(~self.is_leaf.take(nodes))
+        current, offsets = nodes[active], feature_offsets[active]
+        while len(active):
+            values = codes.take(offsets + self.feature.take(current))
+            current = self.ternary_children.take(current * 3 + values)
+            nodes[active] = current
+            walking = ~self.is_leaf.take(current)
+            active, current, offsets = active[walking], current[walking], offsets[walking]
+        return nodes.reshape(n_rows, n_trees)
+
+    def _accumulate(self, leaves, initial=None) -> np.ndarray:
+        # cumsum adds tree by tree, the same order scikit-learn uses
+        values = self.leaf_values[leaves]
+        if initial is not None:
+            values = np.concatenate([initial[:, np.newaxis], values], axis=1)
+        return np.cumsum(values, axis=1)[:, -1]
+
+    def predict(self, X) -> np.ndarray:
+        leaves = self.apply(X)
+
+        if self.kind == "decision_tree":
+            encoded = np.argmax(self.leaf_values[leaves[:, 0]], axis=1)
+
+        elif self.kind == "random_forest":
+            proba = self._accumulate(leaves)
+            proba /= leaves.shape[1]
+            encoded = np.argmax(proba, axis=1)
+
+        elif self.kind == "gradient_boosting":
+            n_outputs = self.params["n_outputs"]
+            init = np.broadcast_to(self.params["init_raw"], (leaves.shape[0], n_outputs))
+            raw = np.stack([
+                self._accumulate(leaves[:, k::n_outputs], init[:, k]) for k in range(n_outputs)
+            ], axis=1)
+            encoded = (raw[:, 0] >= 0).astype(int) if n_outputs == 1 else np.argmax(raw, axis=1)
+
+        elif self.kind == "hist_gradient_boosting":
+            n_outputs = self.params["n_outputs"]
+            init = np.broadcast_to(self.params["init_raw"], (leaves.shape[0], n_outputs))
+            raw = np.stack([
+                self._accumulate(leaves[:, k::n_outputs], init[:, k]) for k in range(n_outputs)
+            ], axis=1)
+            # expit(raw) > 0.5, a tie goes to the first class
+            encoded = (raw[:, 0] > 0).astype(int) if n_outputs == 1 else np.argmax(raw, axis=1)
+
+        elif self.kind == "adaboost":
+            pred = self._accumulate(leaves)
+            pred /= self.params["weight_sum"]
+            if len(self.classes_) == 2:
+                pred[:, 0] *= -1
+                encoded = (pred.sum(axis=1) > 0).astype(int)
+            else:
+                encoded = np.argmax(pred, axis=1)
+
+        return self.classes_.take(encoded, axis=0)
+
+
+def compile_tree_ensemble(model):
+    """
+    Flatten a fitted tree model into a CompiledTreeEnsemble.
+    Returns None for models that are not supported (e.g. Logistic Regression).
+    """
+    if isinstance(model, DecisionTreeClassifier):
+        tree = model.tree_
+        return CompiledTreeEnsemble(
+            "decision_tree", [tree], [tree.value[:, 0, :model.n_classes_]],
+            model.classes_, model.n_features_in_,
+        )
+
+    if isinstance(model, RandomForestClassifier):
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        return CompiledTreeEnsemble(
+            "random_forest", trees, [tree.value[:, 0, :model.n_classes_] for tree in trees],
+            model.classes_, model.n_features_in_,
+        )
+
+    if isinstance(model, GradientBoostingClassifier):
+        if not (isinstance(model.init_, DummyClassifier) or model.init_ == "zero"):
+            return None
+        n_outputs = model.estimators_.shape[1]
+        # stage-major order, output k of stage i is tree i * n_outputs + k
+        trees = [estimator.tree_ for estimator in model.estimators_.ravel()]
+        init_raw = model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32))[0]
+        return CompiledTreeEnsemble(
+            "gradient_boosting", trees,
+            [model.learning_rate * tree.value[:, 0, 0] for tree in trees],
+            model.classes_, model.n_features_in_,
+            n_outputs=n_outputs, init_raw=init_raw,
+        )
+
+    if isinstance(model, HistGradientBoostingClassifier):
+        # iteration-major order, output k of iteration i is tree i * n_outputs + k
+        predictors = [predictor for iteration in model._predictors for predictor in iteration]
+        if any(predictor.nodes["is_categorical"].any() for predictor in predictors):
+            return None
+        trees = [HistTreeNodes(predictor.nodes) for predictor in predictors]
+        return CompiledTreeEnsemble(
+            "hist_gradient_boosting", trees,
+            # leaf values already include the learning rate
+            [predictor.nodes["value"].astype(np.float64) for predictor in predictors],
+            model.classes_, model.n_features_in_,
+            n_outputs=len(model._predictors[0]), init_raw=np.ravel(model._baseline_prediction),
+        )
+
+    if isinstance(model, AdaBoostClassifier):
+        n_classes = model.n_classes_
+        trees, votes = [], []
+        for estimator, weight in zip(model.estimators_, model.estimator_weights_):
+            tree = estimator.tree_
+            predicted = np.argmax(tree.value[:, 0, :n_classes], axis=1)
+            is_predicted = predicted[:, np.newaxis] == np.arange(n_classes)
+            trees.append(tree)
+            votes.append(np.where(is_predicted, weight, -1 / (n_classes - 1) * weight))
+        return CompiledTreeEnsemble(
+            "adaboost", trees, votes, model.classes_, model.n_features_in_,
+            weight_sum=model.estimator_weights_.sum(),
+        )
+
+    return None
+
+
 class NetworkModel:
     def __init__(self,preprocessor,model):
         try:
             self.preprocessor = preprocessor
             self.model = model
+            self.compiled_model = None
         except Exception as e:
             raise NetworkSecurityException(e,sys)
-    
+
+    def compile(self, x_check=None) -> bool:
+        """
+        Compile the model into flat node arrays for fast inference.
+        The compiled model is only kept if it predicts exactly like the
+        original on x_check (transformed features), or on random rows
+        over {-1, 0, 1} when no data is given. Returns True if compiled.
+        Compiling is only an optimisation and reads private scikit-learn
+        attributes, so any failure keeps the sklearn path instead of raising.
+        """
+        self.compiled_model = None
+        try:
+            compiled = compile_tree_ensemble(self.model)
+            if compiled is None:
+                return False
+
+            if x_check is None:
+                rng = np.random.default_rng(42)
+                x_check = rng.integers(-1, 2, size=(COMPILE_CHECK_ROWS, compiled.n_features)).astype(float)
+
+            if not np.array_equal(compiled.predict(x_check), self.model.predict(x_check)):
+                logging.info(f"Compiled {type(self.model).__name__} does not match sklearn, keeping sklearn path")
+                return False
+
+            self.compiled_model = compiled
+            logging.info(f"Compiled {type(self.model).__name__} into {len(compiled.left)} flat nodes")
+            return True
+
+        except Exception as e:
+            logging.info(f"Could not compile {type(self.model).__name__}, keeping sklearn path: {e}")
+            return False
+
     def predict(self,x):
         try:
             x_transform = self.preprocessor.transform(x)
+            # models pickled before compile() existed have no compiled_model
+            compiled_model = getattr(self, "compiled_model", None)
+            if compiled_model is not None and not np.isnan(x_transform).any():
+                return compiled_model.predict(x_transform)
             y_hat = self.model.predict(x_transform)
             return y_hat
         except Exception as e:
@@ -0,0 +1,61 @@
+import sys
+
+import numpy as np
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.impute import KNNImputer, SimpleImputer
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+"""
+this file holds the imputer used by the preprocessing pipeline
+fit() profiles how much of the training data is missing: when at most
+max_missing_row_fraction of the rows have a NaN a most-frequent imputer is
+enough (and pickles to a few bytes), otherwise a KNNImputer is fitted
+transform() only hands rows that contain a NaN to the fitted imputer,
+complete rows are returned as they are, so serving a complete feature
+vector never touches the KNN training matrix
+"""
+
+
+class FastPathImputer(TransformerMixin, BaseEstimator):
+    def __init__(self, knn_params: dict = None, max_missing_row_fraction: float = 0.01):
+        self.knn_params = knn_params
+        self.max_missing_row_fraction = max_missing_row_fraction
+
+    def fit(self, X, y=None):
+        try:
+            if hasattr(X, "columns"):
+                self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+            X = np.asarray(X, dtype=np.float64)
+            self.n_features_in_ = X.shape[1]
+
+            missing = np.isnan(X)
+            self.missing_row_fraction_ = float(missing.any(axis=1).mean()) if len(X) else 0.0
+            self.missing_column_fractions_ = missing.mean(axis=0) if len(X) else np.zeros(X.shape[1])
+
+            if self.missing_row_fraction_ <= self.max_missing_row_fraction:
+                self.imputer_ = SimpleImputer(strategy="most_frequent", keep_empty_features=True)
+            else:
+                knn_params = dict(self.knn_params or {})
+                knn_params.setdefault("keep_empty_features", True)
+                self.imputer_ = KNNImputer(**knn_params)
+            self.imputer_.fit(X)
+
+            logging.info(
+                f"{self.missing_row_fraction_:.2%} of training rows have missing values, "
+                f"using {type(self.imputer_).__name__}"
+            )
+            return self
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def transform(self, X):
+        try:
+            X = np.array(X, dtype=np.float64)
+            rows_with_missing = np.isnan(X).any(axis=1)
+            if rows_with_missing.any():
+                X[rows_with_missing] = self.imputer_.transform(X[rows_with_missing])
+            return X
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
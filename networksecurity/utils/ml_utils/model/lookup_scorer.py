@@ -0,0 +1,141 @@
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+from networksecurity.constant.training_pipeline import LOOKUP_TABLE_MAX_SIZE
+
+"""
+this file serves verdicts from a table keyed by the feature vector itself
+every feature takes a value in {-1, 0, 1} (or is missing), so a vector
+packs into one 64-bit key with 2 bits per feature; the set of distinct
+vectors seen in practice is small, so a URL whose features were seen
+before (even through a different URL) is scored with one dict lookup
+the table is prefilled with the distinct training vectors and grows with
+served traffic: a miss goes through NetworkModel.predict once per distinct
+vector of the batch; swapping the model starts a new table
+"""
+
+# bits per feature in a packed key: -1, 0, 1 and missing
+FEATURE_KEY_BITS = 2
+_MISSING_CODE = 3
+
+
+def pack_feature_vectors(data) -> tuple:
+    """
+    Pack every row of data into a uint64 key.
+    Returns (keys, packable); rows with a value outside {-1, 0, 1, NaN}
+    are not packable and their key is meaningless.
+    """
+    try:
+        data = np.asarray(data, dtype=np.float64)
+        if data.ndim == 1:
+            data = data[np.newaxis, :]
+        if data.shape[1] * FEATURE_KEY_BITS > 64:
+            raise ValueError(f"{data.shape[1]} features do not fit in a 64-bit key")
+
+        missing = np.isnan(data)
+        packable = ~(~missing & ~np.isin(data, (-1.0, 0.0, 1.0))).any(axis=1)
+        codes = np.where(missing, _MISSING_CODE, np.nan_to_num(data) + 1).astype(np.uint64)
+        shifts = (np.arange(data.shape[1], dtype=np.uint64) * np.uint64(FEATURE_KEY_BITS))
+        keys = np.bitwise_or.reduce(codes << shifts, axis=1)
+        return keys, packable
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def unpack_feature_keys(keys, n_features: int) -> np.ndarray:
+    """
+    Feature vectors (float, NaN for missing) of packed keys.
+    """
+    keys = np.asarray(keys, dtype=np.uint64)
+    shifts = np.arange(n_features, dtype=np.uint64) * np.uint64(FEATURE_KEY_BITS)
+    codes = (keys[:, np.newaxis] >> shifts) & np.uint64(_MISSING_CODE)
+    return np.where(codes == _MISSING_CODE, np.nan, codes.astype(np.float64) - 1)
+
+
+class LookupTableScorer:
+    def __init__(self, columns: list, network_model=None, feature_keys=None,
+                 max_size: int = LOOKUP_TABLE_MAX_SIZE):
+        try:
+            self.columns = list(columns)
+            self.max_size = max_size
+            self.hits = 0
+            self.misses = 0
+            self._lock = threading.Lock()
+            self.set_model(network_model, feature_keys)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    @property
+    def network_model(self):
+        return self._state[0]
+
+    def set_model(self, network_model, feature_keys=None) -> None:
+        """
+        Serve network_model from a new table, prefilled with feature_keys
+        (the packed distinct training vectors) when given.
+        """
+        try:
+            table = {}
+            if network_model is not None and feature_keys is not None and len(feature_keys):
+                keys = np.unique(np.asarray(feature_keys, dtype=np.uint64))[:self.max_size]
+                vectors = pd.DataFrame(unpack_feature_keys(keys, len(self.columns)), columns=self.columns)
+                table = dict(zip(keys.tolist(), network_model.predict(vectors).tolist()))
+                logging.info(f"Lookup table prefilled with {len(table)} training feature vectors")
+            # one assignment, so a batch never mixes two models
+            self._state = (network_model, table)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def predict(self, features: pd.DataFrame) -> np.ndarray:
+        """
+        Predictions for the rows of features, like NetworkModel.predict.
+        """
+        try:
+            network_model, table = self._state
+            # column selection costs more than the lookup, skip it when already in order
+            data = features if list(features.columns) == self.columns else features[self.columns]
+            keys, packable = pack_feature_vectors(data.to_numpy(dtype=np.float64))
+            keys = keys.tolist()
+
+            y_pred = [table.get(key) if ok else None for key, ok in zip(keys, packable)]
+            missed = [i for i, verdict in enumerate(y_pred) if verdict is None]
+            if missed:
+                # one model call for the distinct missed vectors of the batch
+                first_row = {}
+                for i in missed:
+                    first_row.setdefault(keys[i] if packable[i] else ("row", i), i)
+                rows = list(first_row.values())
+                predicted = network_model.predict(features.iloc[rows]).tolist()
+                verdicts = dict(zip(first_row, predicted))
+                for i in missed:
+                    y_pred[i] = verdicts[keys[i] if packable[i] else ("row", i)]
+
+                room = self.max_size - len(table)
+                for key, row, verdict in zip(first_row, rows, predicted):
+                    if room <= 0:
+                        break
+                    if packable[row]:
+                        table[key] = verdict
+                        room -= 1
+
+            with self._lock:
+                self.hits += len(y_pred) - len(missed)
+                self.misses += len(missed)
+            return np.asarray(y_pred)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._state[1]),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,151 @@
+import os
+import sys
+import threading
+
+import pandas as pd
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+from networksecurity.constant.training_pipeline import (
+    FINAL_MODEL_FILE_PATH,
+    FINAL_PREPROCESSOR_FILE_PATH,
+    FINAL_MODEL_MANIFEST_FILE_PATH,
+    MODEL_RELOAD_INTERVAL,
+)
+from networksecurity.utils.main_utils.utils import load_object, load_json_file, compute_file_hash
+from networksecurity.utils.ml_utils.model.estimator import NetworkModel
+from networksecurity.utils.ml_utils.feature_extractor import FEATURE_COLUMNS
+
+"""
+this file keeps the served NetworkModel in sync with final_model/
+a background thread polls final_model/manifest.json, which the training
+pipeline writes last, once every final_model/ file of the run is in place;
+when it changes, the version it names is loaded, compiled
+into flat node arrays when it is a tree model, warmed
+with a dummy prediction and swapped in with a single reference assignment
+requests keep using whichever model they picked up, nothing blocks on a reload
+"""
+
+
+class ModelReloader:
+    def __init__(self, preprocessor_file_path: str = FINAL_PREPROCESSOR_FILE_PATH,
+                 model_file_path: str = FINAL_MODEL_FILE_PATH,
+                 manifest_file_path: str = FINAL_MODEL_MANIFEST_FILE_PATH,
+                 interval: float = MODEL_RELOAD_INTERVAL):
+        try:
+            self.preprocessor_file_path = preprocessor_file_path
+            self.model_file_path = model_file_path
+            self.manifest_file_path = manifest_file_path
+            self.interval = interval
+            self.model = None
+            self.version = None
+            self._signature = None
+            self._listeners = []
+            self._stop = threading.Event()
+            self._thread = None
+            self._start_lock = threading.Lock()
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def add_listener(self, callback) -> None:
+        """
+        callback(version, model) is called after every swap.
+        """
+        self._listeners.append(callback)
+
+    def _watched_files(self) -> tuple:
+        # final_model/ published before manifests existed has only the two files
+        if os.path.exists(self.manifest_file_path):
+            return (self.manifest_file_path,)
+        return (self.preprocessor_file_path, self.model_file_path)
+
+    def _file_signature(self):
+        return tuple(
+            (os.stat(path).st_ino, os.stat(path).st_mtime_ns, os.stat(path).st_size)
+            for path in self._watched_files()
+        )
+
+    def _read_version(self) -> str:
+        if os.path.exists(self.manifest_file_path):
+            return load_json_file(self.manifest_file_path)["version"]
+        return compute_file_hash(self.preprocessor_file_path, self.model_file_path)
+
+    def load(self, attempts: int = 3) -> NetworkModel:
+        """
+        Load, warm and swap in the model currently on disk.
+        """
+        try:
+            for attempt in range(attempts):
+                signature = self._file_signature()
+                version = self._read_version()
+                if version == self.version:
+                    self._signature = signature
+                    return self.model
+
+                model = NetworkModel(
+                    preprocessor=load_object(self.preprocessor_file_path),
+                    model=load_object(self.model_file_path),
+                )
+                # a run published while the files were read may have mixed two versions
+                if self._file_signature() == signature:
+                    break
+                logging.info("final_model/ was published again while loading, loading it again")
+            else:
+                raise Exception(f"final_model/ kept changing during {attempts} load attempts")
+
+            model.compile()
+            # first call pays the lazy imports and allocations, not a user request
+            model.predict(pd.DataFrame([[-1] * len(FEATURE_COLUMNS)], columns=FEATURE_COLUMNS))
+
+            self.model = model
+            self.version = version
+            self._signature = signature
+            logging.info(f"Loaded model version {version}")
+
+            for callback in self._listeners:
+                callback(version, model)
+            return model
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def check(self) -> bool:
+        """
+        Reload if the manifest changed since the last load.
+        Returns True when a new model was swapped in.
+        """
+        try:
+            signature = self._file_signature()
+        except OSError:
+            return False
+        if signature == self._signature:
+            return False
+
+        previous_version = self.version
+        try:
+            self.load()
+        except Exception as e:
+            logging.info(f"Model reload failed, keeping version {previous_version}: {e}")
+            return False
+        return self.version != previous_version
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self) -> None:
+        """
+        Start the polling thread if it is not running in this process.
+        Cheap enough to call on every request; threads do not survive a
+        fork, so each gunicorn worker starts its own on first use.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="model-reloader", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -0,0 +1,112 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import threading
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+from networksecurity.constant.training_pipeline import PREDICTION_CACHE_MAX_SIZE, PREDICTION_CACHE_TTL
+from networksecurity.utils.main_utils.cache import TTLCache
+
+"""
+this file caches verdicts of the served model keyed by the URL exactly as
+it was scored: the lexical features read the raw string (its length, an @
+in the fragment, the case of the host), so two spellings of one address
+can get different verdicts and must not share an entry
+the in-memory layer is a bounded LRU+TTL cache, an optional SQLite file
+keeps verdicts across gunicorn restarts and is shared by the workers; each
+process opens its own connection on first use, since one inherited across
+a fork must not be used
+every entry is tied to the model version that produced it, loading a new
+model drops all verdicts of the previous one
+"""
+
+class PredictionCache:
+    def __init__(self, model_version: str = None,
+                 maxsize: int = PREDICTION_CACHE_MAX_SIZE,
+                 ttl: float = PREDICTION_CACHE_TTL,
+                 sqlite_file_path: str = None):
+        try:
+            self.model_version = model_version
+            self.ttl = ttl
+            self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+            self.sqlite_file_path = sqlite_file_path
+            self.sqlite_hits = 0
+            self._lock = threading.Lock()
+            self._conn = None
+            self._conn_pid = None
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        The SQLite connection of this process, opened on first use.
+        Call with self._lock held.
+        """
+        if self._conn is None or self._conn_pid != os.getpid():
+            conn = sqlite3.connect(self.sqlite_file_path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts ("
+                "url TEXT PRIMARY KEY, model_version TEXT, verdict TEXT, expires_at REAL)"
+            )
+            conn.execute("DELETE FROM verdicts WHERE expires_at <= ?", (time.time(),))
+            conn.commit()
+            # the parent's connection is dropped, not closed, it is still the parent's
+            self._conn, self._conn_pid = conn, os.getpid()
+        return self._conn
+
+    def set_model_version(self, model_version: str) -> None:
+        """
+        Invalidate every verdict that was not produced by model_version.
+        """
+        if model_version == self.model_version:
+            return
+        logging.info(f"Prediction cache invalidated: model {self.model_version} -> {model_version}")
+        self.model_version = model_version
+        self.memory.clear()
+        if self.sqlite_file_path:
+            with self._lock:
+                conn = self._connection()
+                conn.execute("DELETE FROM verdicts WHERE model_version != ?", (model_version,))
+                conn.commit()
+
+    def get(self, url: str):
+        """
+        Cached verdict for url, or None.
+        """
+        verdict = self.memory.get(url)
+        if verdict is not None or not self.sqlite_file_path:
+            return verdict
+
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT verdict, expires_at FROM verdicts WHERE url = ? AND model_version = ?",
+                (url, self.model_version),
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+
+        self.sqlite_hits += 1
+        verdict = json.loads(row[0])
+        self.memory.set(url, verdict, ttl=row[1] - time.time())
+        return verdict
+
+    def set(self, url: str, verdict: dict) -> None:
+        self.memory.set(url, verdict)
+        if self.sqlite_file_path:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?)",
+                    (url, self.model_version, json.dumps(verdict), time.time() + self.ttl),
+                )
+                conn.commit()
+
+    def stats(self) -> dict:
+        stats = self.memory.stats()
+        stats["model_version"] = self.model_version
+        stats["sqlite_hits"] = self.sqlite_hits
+        return stats
@@ -1,5 +1,9 @@
-import os,sys,json
-from typing import Collection
+import os,sys
+import json
+import hashlib
+import argparse
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -15,46 +19,160 @@ ca=certifi.where()
 import numpy as np
 import pandas as pd
 import pymongo
+from pymongo import UpdateOne
 from networksecurity.logging import logger
 from networksecurity.exception import NetworkSecurityException
+from networksecurity.constant.training_pipeline import (
+    DATA_INGESTION_DATABASE_NAME,
+    DATA_INGESTION_COLLECTION_NAME,
+)
+
+"""
+this file seeds MongoDB with the phishing dataset
+the CSV is streamed in chunks, each chunk becomes one batch of documents
+that is written with an unordered insert_many (or an unordered bulk of
+upserts) while the next chunks are parsed, over several connections of
+one pooled client
+in upsert mode every row is keyed by its content (plus how many identical
+rows came before it, the dataset has exact duplicates), so loading the same
+rows again updates documents instead of duplicating them, whatever the file
+is called and wherever the rows sit in it
+rows loaded without upsert carry no key: upsert mode does not dedupe them,
+the unique index only covers documents that have a key
+"""
+
+# rows per batch written to MongoDB
+PUSH_DATA_CHUNK_SIZE=5_000
+# concurrent batches, one pooled connection each
+PUSH_DATA_N_CONNECTIONS=4
+# field holding the upsert key of a row
+PUSH_DATA_ROW_KEY="row_key"
+
+
+def row_content_hash(record:dict) -> str:
+    '''hash of the field values of a record; 1 and 1.0 hash the same'''
+    values=[
+        (field,int(value) if isinstance(value,float) and value.is_integer() else value)
+        for field,value in sorted(record.items())
+    ]
+    return hashlib.sha1(json.dumps(values,default=str).encode()).hexdigest()
+
 
 class NetworkDataExtract:
-    def __init__(self):
+    def __init__(self,chunk_size:int=PUSH_DATA_CHUNK_SIZE,n_connections:int=PUSH_DATA_N_CONNECTIONS):
+        try:
+            self.chunk_size=chunk_size
+            self.n_connections=n_connections
+            self.mongo_client=None
+        except Exception as e:
+            raise NetworkSecurityException(e,sys)
+
+    def get_mongo_client(self):
+        '''one client per loader, its pool serves every concurrent batch'''
+        if self.mongo_client is None:
+            self.mongo_client=pymongo.MongoClient(
+                MONGO_DB_URL,tlsCAFile=ca,maxPoolSize=self.n_connections
+            )
+        return self.mongo_client
+
+    def iter_record_batches(self,cv_path,upsert:bool=False):
+        '''
+        Yield the CSV as lists of documents, chunk_size rows at a time.
+        Values keep their parsed type, missing values become None.
+        With upsert each document carries a row_key "<content hash>:<n>", n
+        counting the identical rows before it in the file.
+        '''
         try:
-            pass
+            occurrences=Counter()
+            for chunk in pd.read_csv(cv_path,chunksize=self.chunk_size):
+                if chunk.isna().to_numpy().any():
+                    chunk=chunk.astype(object).where(chunk.notna(),None)
+                records=chunk.to_dict("records")
+                if upsert:
+                    for record in records:
+                        content_hash=row_content_hash(record)
+                        record[PUSH_DATA_ROW_KEY]=f"{content_hash}:{occurrences[content_hash]}"
+                        occurrences[content_hash]+=1
+                yield records
         except Exception as e:
             raise NetworkSecurityException(e,sys)
 
     def cv_to_json(self,cv_path):
         try:
-            data=pd.read_csv(cv_path)
-            data.reset_index(drop=True,inplace=True)
-            records=list(json.loads(data.T.to_json()).values())
-            return records
+            return [record for records in self.iter_record_batches(cv_path) for record in records]
         except Exception as e:
             raise NetworkSecurityException(e,sys)
-        
-    def insert_data_to_mongodb(self,records,database,collection):
+
+    @staticmethod
+    def write_batch(collection_handle,records,upsert:bool=False) -> int:
+        if not upsert:
+            return len(collection_handle.insert_many(records,ordered=False).inserted_ids)
+        result=collection_handle.bulk_write(
+            [
+                UpdateOne({PUSH_DATA_ROW_KEY:record[PUSH_DATA_ROW_KEY]},{"$set":record},upsert=True)
+                for record in records
+            ],
+            ordered=False,
+        )
+        return result.upserted_count+result.matched_count
+
+    def insert_data_to_mongodb(self,records,database,collection,upsert:bool=False):
+        '''
+        Write records (a list of documents, or an iterable of lists of
+        documents) and return the number of documents written.
+        At most two batches per connection are in flight.
+        '''
         try:
-            self.mongo_client=pymongo.MongoClient(MONGO_DB_URL,tlsCAFile=ca)
-            db=self.mongo_client[database]
-            collection_handle=db[collection]
-            collection_handle.insert_many(records)
-            return len(records)
+            if isinstance(records,list) and (not records or isinstance(records[0],dict)):
+                records=[records[i:i+self.chunk_size] for i in range(0,len(records),self.chunk_size)]
+
+            collection_handle=self.get_mongo_client()[database][collection]
+            if upsert:
+                # partial, so documents loaded without upsert (no key) do not all index as null
+                collection_handle.create_index(
+                    PUSH_DATA_ROW_KEY,unique=True,
+                    partialFilterExpression={PUSH_DATA_ROW_KEY:{"$exists":True}},
+                )
+
+            written=0
+            with ThreadPoolExecutor(max_workers=self.n_connections) as executor:
+                pending=deque()
+                for batch in records:
+                    if not batch:
+                        continue
+                    pending.append(executor.submit(self.write_batch,collection_handle,batch,upsert))
+                    if len(pending)>=2*self.n_connections:
+                        written+=pending.popleft().result()
+                while pending:
+                    written+=pending.popleft().result()
+            return written
         except Exception as e:
             raise NetworkSecurityException(e,sys)
 
+    def load_csv_to_mongodb(self,cv_path,database,collection,upsert:bool=False):
+        '''Stream cv_path into database.collection, see insert_data_to_mongodb'''
+        return self.insert_data_to_mongodb(
+            self.iter_record_batches(cv_path,upsert=upsert),database,collection,upsert=upsert
+        )
+
 
 if __name__=="__main__":
     try:
-        FILE_PATH="Network_Data\phisingData.csv"
-        DATABASE="netsec"
-        Collection="Network_Data"
-        networkobj=NetworkDataExtract()
-        records=networkobj.cv_to_json(FILE_PATH)
-        no_of_records=networkobj.insert_data_to_mongodb(records,DATABASE,Collection)
+        parser=argparse.ArgumentParser(description="Load the phishing dataset CSV into MongoDB")
+        parser.add_argument("file_path",nargs="?",default=os.path.join("Network_Data","phisingData.csv"))
+        parser.add_argument("--database",default=DATA_INGESTION_DATABASE_NAME)
+        parser.add_argument("--collection",default=DATA_INGESTION_COLLECTION_NAME)
+        parser.add_argument("--upsert",action="store_true",help="update rows loaded before in upsert mode instead of duplicating them "
+                                 "(rows loaded without --upsert are not deduplicated)")
+        parser.add_argument("--chunk-size",type=int,default=PUSH_DATA_CHUNK_SIZE)
+        parser.add_argument("--connections",type=int,default=PUSH_DATA_N_CONNECTIONS)
+        args=parser.parse_args()
+
+        networkobj=NetworkDataExtract(chunk_size=args.chunk_size,n_connections=args.connections)
+        no_of_records=networkobj.load_csv_to_mongodb(
+            args.file_path,args.database,args.collection,upsert=args.upsert
+        )
         print(f"Number of records inserted: {no_of_records}")
-        print(f"records inserted: {records}")
 
     except Exception as e:
         print(e)